@@ -12,6 +12,7 @@ from .data import diamonds
 from .summary_functions import *
 from .window_functions import *
 from .vector import *
+from .lazy import *
 
 for verb in dir():
     if 'ize' in verb:
@@ -1,8 +1,79 @@
 import pandas as pd
 import numpy as np
 import warnings
+import importlib
+import os
+import re
 from functools import partial, wraps
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+
+# ------------------------------------------------------------------------------
+# Options
+# ------------------------------------------------------------------------------
+
+options = {
+    # When True, each pipe stage receives a shallow copy of its input rather
+    # than a deep copy. Column data is shared between stages and verbs that
+    # write replace whole columns instead of modifying them in place.
+    'copy_on_write': False,
+    # When True and numexpr is installed, arithmetic, comparison and boolean
+    # expressions in `mutate`, `transmute` and `mask` are evaluated as a
+    # single numexpr kernel for frames with at least `compile_min_rows` rows.
+    'compile_expressions': True,
+    'compile_min_rows': 100000,
+    # A `concurrent.futures.Executor` that grouped verbs without a vectorized
+    # implementation use to run groups in parallel, and partitioned joins
+    # their partitions, or None to run them one after the other. Can be set
+    # for a single stage with `pipe.using`.
+    'group_executor': None,
+    # Budgets for the number of rows and (estimated) bytes of the result of
+    # a join, checked from the key counts of both sides before joining, or
+    # None for no limit. Can be set for a single join with the `max_rows`
+    # and `max_bytes` keyword arguments.
+    'join_max_rows': None,
+    'join_max_bytes': None,
+}
+
+
+def get_option(name):
+    """
+    Returns the current value of a dfply option.
+
+    Args:
+        name (str): name of the option.
+    """
+
+    if name not in options:
+        raise KeyError('Unknown option: {}'.format(name))
+    return options[name]
+
+
+def set_option(name, value):
+    """
+    Sets the value of a dfply option.
+
+    Args:
+        name (str): name of the option.
+        value: new value for the option.
+    """
+
+    if name not in options:
+        raise KeyError('Unknown option: {}'.format(name))
+    if name == 'copy_on_write' and value and _pandas_version() < (1, 5):
+        # older pandas may write assigned columns into blocks shared with
+        # the frame that was copied
+        raise ValueError('The copy_on_write option needs pandas 1.5 or later')
+    options[name] = value
+
+
+def _pandas_version():
+    return tuple(int(part) for part in re.findall(r'\d+', pd.__version__)[:2])
+
 
 def _recursive_apply(f, l):
     if isinstance(l, (list, tuple)):
@@ -51,36 +122,80 @@ def _delayed_function(function, args, kwargs):
 
 
 def make_symbolic(f):
+    @wraps(f)
     def wrapper(*args, **kwargs):
         delay = _check_delayed_eval(args, kwargs)
         if delay:
             delayed = _delayed_function(f, args, kwargs)
-            return Intention(delayed)
+            return Intention(delayed,
+                             expression=('function', wrapper, args, kwargs))
         else:
             return f(*args, **kwargs)
 
+    wrapper.kind = getattr(f, 'kind', None)
+    wrapper.grouped = None
+    wrapper.grouped_per_group = False
     return wrapper
 
 
+def symbolic_kind(kind):
+    """
+    Declares how a `make_symbolic` function maps input rows to output values.
+    The kind is used to decide how an expression can be evaluated or
+    reordered.
+
+    Args:
+        kind (str): one of `'elementwise'` (each output value depends only
+            on the same row of the inputs), `'window'` (one output value per
+            row that depends on other rows) or `'aggregate'` (a single output
+            value).
+    """
+
+    def decorator(f):
+        f.kind = kind
+        return f
+
+    return decorator
+
+
 class Intention(object):
-    def __init__(self, function=lambda x: x, invert=False):
+    """
+    A delayed computation against the DataFrame passing through a pipe.
+
+    Besides the composed `function`, an Intention records the `expression`
+    that built it as a tuple, so that verbs can inspect it before evaluation:
+
+        ('symbol',)                              the `X` symbol itself
+        ('attr', parent, name)                   parent.name
+        ('call', parent, args, kwargs)           parent(*args, **kwargs)
+        ('method', parent, name, args, kwargs)   magic method on parent
+        ('function', f, args, kwargs)            `make_symbolic` function call
+
+    The expression is `None` for Intentions built directly from a function.
+    """
+
+    def __init__(self, function=lambda x: x, invert=False, expression=None):
         self.function = function
         self.inverted = invert
+        self.expression = expression
 
     def evaluate(self, context):
         return self.function(context)
 
     def __getattr__(self, attribute):
         return Intention(lambda x: getattr(self.function(x), attribute),
-                         invert=self.inverted)
+                         invert=self.inverted,
+                         expression=('attr', self, attribute))
 
     def __invert__(self):
-        return Intention(self.function, invert=not self.inverted)
+        return Intention(self.function, invert=not self.inverted,
+                         expression=self.expression)
 
     def __call__(self, *args, **kwargs):
         return Intention(lambda x: self.function(x)(*_context_args(args)(x),
                                                     **_context_kwargs(kwargs)(x)),
-                         invert=self.inverted)
+                         invert=self.inverted,
+                         expression=('call', self, args, kwargs))
 
 
 _magic_method_names = [
@@ -106,7 +221,8 @@ def _set_magic_method(name):
     def magic_method(self, *args, **kwargs):
         return Intention(lambda x: getattr(self.function(x), name)(*_context_args(args)(x),
                                                                    **_context_kwargs(kwargs)(x)),
-                         invert=self.inverted)
+                         invert=self.inverted,
+                         expression=('method', self, name, args, kwargs))
 
     return magic_method
 
@@ -115,7 +231,817 @@ for name in _magic_method_names:
     setattr(Intention, name, _set_magic_method(name))
 
 # Initialize the global X symbol
-X = Intention()
+X = Intention(expression=('symbol',))
+
+
+# ------------------------------------------------------------------------------
+# Intention expression inspection
+# ------------------------------------------------------------------------------
+
+_elementwise_magic_methods = set([
+    '__abs__', '__add__', '__and__', '__eq__', '__floordiv__', '__ge__',
+    '__gt__', '__le__', '__lt__', '__mod__', '__mul__', '__ne__', '__neg__',
+    '__or__', '__pos__', '__pow__', '__radd__', '__rand__', '__rfloordiv__',
+    '__rmod__', '__rmul__', '__ror__', '__rpow__', '__rsub__',
+    '__rtruediv__', '__rxor__', '__sub__', '__truediv__', '__xor__',
+])
+
+_elementwise_series_methods = set([
+    'abs', 'astype', 'between', 'clip', 'isna', 'isnull', 'notna', 'notnull',
+    'round',
+])
+
+# methods of the .str and .dt accessors computed row by row (and not, for
+# example, str.cat, which concatenates the whole column)
+_elementwise_accessor_methods = {
+    'str': set([
+        'capitalize', 'casefold', 'center', 'contains', 'count', 'decode',
+        'encode', 'endswith', 'extract', 'find', 'findall', 'fullmatch', 'get',
+        'index', 'isalnum', 'isalpha', 'isdecimal', 'isdigit', 'islower',
+        'isnumeric', 'isspace', 'istitle', 'isupper', 'join', 'len', 'ljust',
+        'lower', 'lstrip', 'match', 'normalize', 'pad', 'partition',
+        'removeprefix', 'removesuffix', 'repeat', 'replace', 'rfind', 'rindex',
+        'rjust', 'rpartition', 'rsplit', 'rstrip', 'slice', 'slice_replace',
+        'split', 'startswith', 'strip', 'swapcase', 'title', 'translate',
+        'upper', 'wrap', 'zfill',
+    ]),
+    'dt': set([
+        'ceil', 'day_name', 'floor', 'month_name', 'normalize', 'round',
+        'strftime', 'to_period', 'total_seconds', 'tz_convert', 'tz_localize',
+    ]),
+}
+
+# attributes of the accessors that describe the whole column
+_aggregate_accessor_attributes = set(['freq', 'inferred_freq'])
+
+
+def _is_symbol(arg):
+    return isinstance(arg, Intention) and arg.expression == ('symbol',)
+
+
+def expression_children(arg):
+    """
+    Returns the Intentions that an Intention's expression is built from,
+    including any found in the arguments of calls.
+    """
+
+    expression = arg.expression
+    if expression is None or expression[0] == 'symbol':
+        return []
+    if expression[0] == 'function':
+        operands = [expression[2], list(expression[3].values())]
+    elif expression[0] == 'attr':
+        operands = [expression[1]]
+    elif expression[0] == 'call':
+        operands = [expression[1], expression[2], list(expression[3].values())]
+    else:
+        operands = [expression[1], expression[3], list(expression[4].values())]
+    return [a for a in flatten(operands) if isinstance(a, Intention)]
+
+
+def intention_label(arg):
+    """
+    Returns the column label for Intentions of the form `X.col` or
+    `X['col']`, and `None` for anything else.
+    """
+
+    if not isinstance(arg, Intention) or arg.expression is None:
+        return None
+    expression = arg.expression
+    if expression[0] == 'attr' and _is_symbol(expression[1]):
+        # DataFrame attributes take precedence over columns in getattr
+        if not hasattr(pd.DataFrame, expression[2]):
+            return expression[2]
+    if (expression[0] == 'method' and _is_symbol(expression[1]) and
+            expression[2] == '__getitem__' and len(expression[3]) == 1 and
+            isinstance(expression[3][0], str)):
+        return expression[3][0]
+    return None
+
+
+def intention_columns(arg):
+    """
+    Returns the set of column labels an argument reads from the DataFrame.
+    Lists and tuples are searched recursively and non-symbolic values read
+    no columns. Returns `None` when the columns cannot be determined, for
+    example when the expression uses the whole DataFrame.
+    """
+
+    if isinstance(arg, (list, tuple)):
+        columns = set()
+        for a in flatten(arg):
+            a_columns = intention_columns(a)
+            if a_columns is None:
+                return None
+            columns |= a_columns
+        return columns
+    if not isinstance(arg, Intention):
+        return set()
+
+    label = intention_label(arg)
+    if label is not None:
+        return set([label])
+    if arg.expression is None or _is_symbol(arg):
+        return None
+    return intention_columns(expression_children(arg))
+
+
+def expression_key(arg):
+    """
+    Returns a hashable key describing the structure of an argument, so that
+    structurally identical Intentions get equal keys. Returns `None` for
+    Intentions whose structure is not known.
+    """
+
+    if isinstance(arg, Intention):
+        expression = arg.expression
+        if expression is None:
+            return None
+        if expression[0] == 'function':
+            parts = [expression[1], expression_key(list(expression[2])),
+                     expression_key(expression[3])]
+        elif expression[0] == 'method':
+            parts = [expression_key(expression[1]), expression[2],
+                     expression_key(list(expression[3])),
+                     expression_key(expression[4])]
+        elif expression[0] == 'call':
+            parts = [expression_key(expression[1]),
+                     expression_key(list(expression[2])),
+                     expression_key(expression[3])]
+        elif expression[0] == 'attr':
+            parts = [expression_key(expression[1]), expression[2]]
+        else:
+            parts = []
+        if any([p is None for p in parts]):
+            return None
+        return (expression[0],) + tuple(parts)
+    if isinstance(arg, (list, tuple)):
+        keys = [expression_key(a) for a in arg]
+        if any([k is None for k in keys]):
+            return None
+        return (type(arg).__name__,) + tuple(keys)
+    if isinstance(arg, dict):
+        # in insertion order, since keys of mixed types cannot be sorted
+        keys = [(expression_key(k), expression_key(v)) for k, v in arg.items()]
+        if any([k[0] is None or k[1] is None for k in keys]):
+            return None
+        return ('dict',) + tuple(keys)
+    if isinstance(arg, (float, complex, np.floating, np.complexfloating)):
+        # equal floats can still give different results (0.0 and -0.0), so
+        # they are keyed by their exact representation
+        return ('constant', type(arg), repr(arg))
+    try:
+        hash(arg)
+    except TypeError:
+        # unhashable values such as arrays are only equal to themselves
+        return ('object', id(arg))
+    return ('constant', type(arg), arg)
+
+
+def evaluate_expression(arg, context, cache):
+    """
+    Evaluates an Intention by walking its expression, evaluating each
+    distinct subexpression only once. Results are stored in `cache` by
+    `expression_key`, so passing the same cache when evaluating several
+    Intentions against the same context shares their common parts.
+    Expressions are assumed to be deterministic.
+
+    Like `Intention.evaluate`, the `inverted` flag is not applied.
+    """
+
+    if not isinstance(arg, Intention):
+        return arg
+    key = expression_key(arg)
+    if key is None:
+        return arg.evaluate(context)
+    if key in cache:
+        return cache[key]
+
+    evaluate = lambda a: evaluate_expression(a, context, cache)
+    expression = arg.expression
+    if expression[0] == 'symbol':
+        value = context
+    elif expression[0] == 'attr':
+        value = getattr(evaluate(expression[1]), expression[2])
+    elif expression[0] == 'call':
+        value = evaluate(expression[1])(
+            *_recursive_apply(evaluate, expression[2]),
+            **{k: _recursive_apply(evaluate, v) for k, v in expression[3].items()})
+    elif expression[0] == 'method':
+        value = getattr(evaluate(expression[1]), expression[2])(
+            *_recursive_apply(evaluate, expression[3]),
+            **{k: _recursive_apply(evaluate, v) for k, v in expression[4].items()})
+    else:
+        value = expression[1](
+            *_recursive_apply(evaluate, expression[2]),
+            **{k: _recursive_apply(evaluate, v) for k, v in expression[3].items()})
+
+    cache[key] = value
+    return value
+
+
+def _is_row_aligned_constant(arg):
+    # scalars broadcast to every row; sized values such as lists and arrays
+    # are aligned by position and so depend on which rows there are
+    return (isinstance(arg, (str, bytes, type, np.dtype)) or
+            not hasattr(arg, '__len__'))
+
+
+def is_elementwise(arg):
+    """
+    Returns True if an argument is computed row by row from the columns it
+    reads, so that evaluating it on a subset of rows gives the same values as
+    evaluating it on all rows and then subsetting.
+    """
+
+    if not isinstance(arg, Intention):
+        return _is_row_aligned_constant(arg)
+    if intention_label(arg) is not None:
+        return True
+
+    expression = arg.expression
+    if expression is None or expression[0] == 'symbol':
+        return False
+
+    operands_elementwise = lambda operands: all(
+        is_elementwise(a) if isinstance(a, Intention)
+        else _is_row_aligned_constant(a)
+        for a in operands)
+
+    if expression[0] == 'method':
+        return (expression[2] in _elementwise_magic_methods and
+                operands_elementwise([expression[1]] + list(expression[3]) +
+                                     list(expression[4].values())))
+    if expression[0] == 'function':
+        return (getattr(expression[1], 'kind', None) == 'elementwise' and
+                operands_elementwise(list(expression[2]) +
+                                     list(expression[3].values())))
+
+    if expression[0] == 'attr':
+        parent = expression[1].expression
+        # attributes of .str and .dt accessors, such as X.date.dt.year
+        return (parent is not None and parent[0] == 'attr' and
+                parent[2] in _elementwise_accessor_methods and
+                expression[2] not in _aggregate_accessor_attributes and
+                is_elementwise(parent[1]))
+
+    # expression[0] == 'call'
+    method = expression[1].expression
+    if method is None or method[0] != 'attr':
+        return False
+    owner = method[1]
+    arguments = list(expression[2]) + list(expression[3].values())
+    if method[2] == 'isin':
+        # the values looked up are a set of values, not aligned with the rows
+        return (is_elementwise(owner) and not _is_symbol(owner) and
+                not any([isinstance(a, Intention) for a in flatten(arguments)]))
+    if method[2] in _elementwise_series_methods:
+        elementwise_owner = is_elementwise(owner) and not _is_symbol(owner)
+    else:
+        accessor = owner.expression
+        elementwise_owner = (accessor is not None and accessor[0] == 'attr' and
+                             method[2] in _elementwise_accessor_methods.get(accessor[2], ()) and
+                             is_elementwise(accessor[1]))
+    return elementwise_owner and operands_elementwise(arguments)
+
+
+# ------------------------------------------------------------------------------
+# Grouped expression evaluation
+# ------------------------------------------------------------------------------
+
+def grouped_implementation(symbolic_function, per_group=False):
+    """
+    Registers a vectorized implementation of a `make_symbolic` function for
+    grouped DataFrames, computing the function for every group at once.
+    Grouped `mutate`, `transmute`, `mask` and `summarize` use it instead of
+    calling the function once per group.
+
+    The implementation is called with the evaluated first argument as a
+    pandas Series, an array with the group number of every row, and the
+    remaining arguments of the call, where symbolic arguments are evaluated
+    to Series aligned with the first one. Groups are numbered from 0 in
+    sorted key order.
+
+    By default the implementation returns a Series aligned with the input,
+    holding the values the function returns when applied to each group
+    separately, which suits window functions. With `per_group=True` it
+    returns one value per group, ordered by group number, which suits
+    aggregates: `summarize` uses the values directly and `mutate` broadcasts
+    them to the rows of each group.
+
+    Args:
+        symbolic_function: the `make_symbolic` function to register the
+            implementation for.
+
+    Kwargs:
+        per_group (bool): whether the implementation returns one value per
+            group rather than one value per row.
+
+    Example:
+        @symbolic_kind('aggregate')
+        @make_symbolic
+        def weighted_mean(series, weights):
+            return (series * weights).sum() / weights.sum()
+
+        @grouped_implementation(weighted_mean, per_group=True)
+        def _grouped_weighted_mean(series, codes, weights):
+            totals = (series * weights).groupby(codes).sum()
+            return totals / weights.groupby(codes).sum()
+    """
+
+    def decorator(implementation):
+        symbolic_function.grouped = implementation
+        symbolic_function.grouped_per_group = per_group
+        return implementation
+
+    return decorator
+
+
+def _has_grouped_implementation(expression):
+    if getattr(expression[1], 'grouped', None) is None or not expression[2]:
+        return False
+    args, kwargs = expression[2], expression[3]
+    return (isinstance(args[0], Intention) and
+            all([is_elementwise(a) for a in flatten([args, list(kwargs.values())])
+                 if isinstance(a, Intention)]))
+
+
+def _call_grouped(expression, df, codes, cache):
+    function, args, kwargs = expression[1], expression[2], expression[3]
+    evaluate = lambda a: (evaluate_expression(a, df, cache)
+                          if isinstance(a, Intention) else a)
+    series = evaluate(args[0])
+    if not isinstance(series, pd.Series):
+        series = pd.Series(series, index=df.index)
+    return function.grouped(
+        series, codes, *_recursive_apply(evaluate, args[1:]),
+        **{k: _recursive_apply(evaluate, v) for k, v in kwargs.items()})
+
+
+def is_group_vectorizable(arg):
+    """
+    Returns True if an argument can be evaluated for all groups of a grouped
+    DataFrame at once: it combines elementwise operations with functions
+    that have a grouped implementation applied to elementwise arguments.
+    """
+
+    if not isinstance(arg, Intention):
+        return _is_row_aligned_constant(arg)
+    if is_elementwise(arg):
+        return True
+
+    expression = arg.expression
+    if expression is None:
+        return False
+    if expression[0] == 'function':
+        function, args, kwargs = expression[1], expression[2], expression[3]
+        if getattr(function, 'grouped', None) is not None:
+            return _has_grouped_implementation(expression)
+        if getattr(function, 'kind', None) == 'elementwise':
+            return all([is_group_vectorizable(a) for a in
+                        list(args) + list(kwargs.values())])
+        return False
+    if expression[0] == 'method' and expression[2] in _elementwise_magic_methods:
+        return all([is_group_vectorizable(a) for a in
+                    [expression[1]] + list(expression[3]) +
+                    list(expression[4].values())])
+    return False
+
+
+def evaluate_grouped(arg, df, codes, cache):
+    """
+    Evaluates an argument accepted by `is_group_vectorizable` for every
+    group of a DataFrame at once.
+
+    Args:
+        arg: the argument to evaluate.
+        df (pandas.DataFrame): the whole (grouped) DataFrame.
+        codes (numpy.ndarray): the group number of every row of `df`.
+        cache (dict): subexpression cache, see `evaluate_expression`.
+    """
+
+    if not isinstance(arg, Intention):
+        return arg
+    if is_elementwise(arg):
+        return evaluate_expression(arg, df, cache)
+
+    evaluate = lambda a: evaluate_grouped(a, df, codes, cache)
+    expression = arg.expression
+    if expression[0] == 'function':
+        function, args, kwargs = expression[1], expression[2], expression[3]
+        if function.grouped is not None:
+            values = _call_grouped(expression, df, codes, cache)
+            if function.grouped_per_group:
+                values = pd.Series(pd.Series(values).values[codes], index=df.index)
+            return values
+        return function(*_recursive_apply(evaluate, args),
+                        **{k: _recursive_apply(evaluate, v) for k, v in kwargs.items()})
+
+    return getattr(evaluate(expression[1]), expression[2])(
+        *_recursive_apply(evaluate, expression[3]),
+        **{k: _recursive_apply(evaluate, v) for k, v in expression[4].items()})
+
+
+def is_group_summary(arg):
+    """
+    Returns True if an argument is a summary of each group that can be
+    computed for all groups at once: it combines functions with a per-group
+    grouped implementation, applied to elementwise arguments, with
+    elementwise operations and scalars.
+    """
+
+    if not isinstance(arg, Intention):
+        return np.isscalar(arg)
+    expression = arg.expression
+    if expression is None or arg.inverted:
+        return False
+    if expression[0] == 'function':
+        function, args, kwargs = expression[1], expression[2], expression[3]
+        if getattr(function, 'grouped_per_group', False):
+            return _has_grouped_implementation(expression)
+        if getattr(function, 'kind', None) == 'elementwise':
+            return all([is_group_summary(a) for a in
+                        flatten([args, list(kwargs.values())])])
+        return False
+    if expression[0] == 'method' and expression[2] in _elementwise_magic_methods:
+        return all([is_group_summary(a) for a in
+                    flatten([expression[1], expression[3],
+                             list(expression[4].values())])])
+    return False
+
+
+def evaluate_group_summary(arg, df, codes, cache):
+    """
+    Evaluates an argument accepted by `is_group_summary`, returning one
+    value per group ordered by group number.
+
+    Args:
+        arg: the argument to evaluate.
+        df (pandas.DataFrame): the whole (grouped) DataFrame.
+        codes (numpy.ndarray): the group number of every row of `df`.
+        cache (dict): subexpression cache, see `evaluate_expression`.
+    """
+
+    if not isinstance(arg, Intention):
+        return arg
+
+    evaluate = lambda a: evaluate_group_summary(a, df, codes, cache)
+    expression = arg.expression
+    if expression[0] == 'function':
+        function, args, kwargs = expression[1], expression[2], expression[3]
+        if function.grouped_per_group:
+            return pd.Series(_call_grouped(expression, df, codes, cache)).reset_index(drop=True)
+        return function(*_recursive_apply(evaluate, args),
+                        **{k: _recursive_apply(evaluate, v) for k, v in kwargs.items()})
+
+    return getattr(evaluate(expression[1]), expression[2])(
+        *_recursive_apply(evaluate, expression[3]),
+        **{k: _recursive_apply(evaluate, v) for k, v in expression[4].items()})
+
+
+class GroupIndex(object):
+    """
+    The grouping of a DataFrame's rows, computed once by `group_by` and
+    carried along the pipe so that grouped verbs do not hash the grouping
+    columns again.
+
+    The index stays attached to frames whose grouping columns are the very
+    same arrays it was built from, so it is dropped as soon as a verb
+    replaces a grouping column or reorders or filters rows. Verbs that
+    filter rows can derive the new index with `take`. The index is only
+    carried through dfply's own verbs, since other functions may modify
+    grouping column values in place, which is not detected.
+
+    Attributes:
+        columns (list): the grouping columns.
+        codes (numpy.ndarray): the group number of every row. Groups are
+            numbered in sorted key order, like `groupby` numbers them.
+        keys (pandas.Index): the key of every group.
+        contiguous (bool): whether the rows are sorted by group, so that
+            every group is a slice of the frame.
+    """
+
+    def __init__(self, columns, codes, keys, fingerprint, contiguous=False):
+        self.columns = list(columns)
+        self.codes = codes
+        self.keys = keys
+        self.fingerprint = fingerprint
+        self.contiguous = contiguous
+
+    @property
+    def ngroups(self):
+        return len(self.keys)
+
+    @property
+    def sizes(self):
+        """The number of rows in every group."""
+        return np.bincount(self.codes, minlength=self.ngroups)
+
+    @property
+    def sorter(self):
+        """Row positions ordered by group, keeping the row order within groups."""
+        if self.contiguous:
+            return np.arange(len(self.codes))
+        return np.argsort(self.codes, kind='mergesort')
+
+    def slices(self):
+        """The slice of rows of every group of a contiguous index."""
+        boundaries = self.boundaries
+        return [slice(start, stop) for start, stop in zip(boundaries[:-1], boundaries[1:])]
+
+    @property
+    def boundaries(self):
+        """Start of every group in `sorter`, followed by the number of rows."""
+        return np.concatenate([[0], np.cumsum(self.sizes)])
+
+    @property
+    def positions(self):
+        """The position of every row within its group."""
+        sorter = self.sorter
+        positions = np.empty(len(self.codes), dtype=np.int64)
+        positions[sorter] = (np.arange(len(self.codes)) -
+                             self.boundaries[self.codes[sorter]])
+        return positions
+
+    def is_valid_for(self, df):
+        return (getattr(df, '_grouped_by', None) == self.columns and
+                _key_fingerprint(df, self.columns) == self.fingerprint)
+
+    def rebind(self, df):
+        """
+        Returns this index for a DataFrame with the same grouping column
+        values, such as a copy of the frame it was built from.
+        """
+
+        fingerprint = _key_fingerprint(df, self.columns)
+        if fingerprint is None:
+            return None
+        return GroupIndex(self.columns, self.codes, self.keys, fingerprint,
+                          self.contiguous)
+
+    def take(self, positions, df):
+        """
+        Returns the index of the rows of the indexed frame at `positions`
+        (integer positions or a boolean mask), where `df` is the frame made
+        of those rows. Groups without rows are dropped and the remaining
+        groups renumbered, without hashing any keys.
+        """
+
+        codes = self.codes[positions]
+        present = np.bincount(codes, minlength=self.ngroups) > 0
+        renumbered = np.cumsum(present) - 1
+        codes = renumbered[codes]
+        index = GroupIndex(self.columns, codes, self.keys[present], None,
+                           bool((codes[1:] >= codes[:-1]).all()))
+        return index.rebind(df)
+
+
+def _key_fingerprint(df, columns):
+    if df.columns.duplicated().any():
+        return None
+    fingerprint = [df.shape[0]]
+    for column in columns:
+        values = df[column].values if column in df.columns else None
+        if not isinstance(values, np.ndarray):
+            return None
+        fingerprint.append((values.__array_interface__['data'][0],
+                            values.strides))
+    return fingerprint
+
+
+def _contiguous_group_index(keys, presorted):
+    """
+    Computes the codes and keys of groups from the runs of equal keys of a
+    DataFrame sorted by its keys, without hashing them. Returns `None` if
+    the keys are not sorted.
+    """
+
+    if not presorted:
+        # sorted keys start with a sorted first column, which is quick to
+        # check before building the keys of the runs
+        try:
+            if not keys.iloc[:, 0].is_monotonic_increasing:
+                return None
+        except TypeError:
+            return None
+
+    changed = np.zeros(keys.shape[0] - 1, dtype=bool)
+    for column in keys.columns:
+        values = keys[column].values
+        changed |= values[1:] != values[:-1]
+    starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+
+    run_keys = keys.iloc[starts]
+    if run_keys.shape[1] == 1:
+        group_keys = pd.Index(run_keys.iloc[:, 0].values, name=run_keys.columns[0])
+    else:
+        group_keys = pd.MultiIndex.from_frame(run_keys)
+    if not presorted and run_keys.shape[1] > 1:
+        # runs differ from the run before them, so keys that never decrease
+        # are unique
+        try:
+            if not group_keys.is_monotonic_increasing:
+                return None
+        except TypeError:
+            return None
+
+    codes = np.concatenate([[0], np.cumsum(changed)])
+    return codes, group_keys
+
+
+def build_group_index(df, grouped_by, presorted=False):
+    """
+    Computes the `GroupIndex` of a DataFrame grouped by the `grouped_by`
+    columns. Returns `None` if the grouping has missing or categorical
+    keys, which `groupby.apply` treats differently.
+
+    Frames sorted by their grouping columns are detected and indexed from
+    the runs of equal keys, without hashing them. Passing `presorted=True`
+    skips checking the order of the runs.
+    """
+
+    if not all([g in df.columns for g in grouped_by]):
+        return None
+    keys = df[grouped_by]
+    if any([keys[g].dtype.name == 'category' for g in grouped_by]):
+        return None
+    # one column at a time, which is much quicker for object columns
+    if any([keys[g].isnull().values.any() for g in grouped_by]):
+        return None
+    fingerprint = _key_fingerprint(df, grouped_by)
+    if fingerprint is None:
+        return None
+
+    if df.shape[0] > 0:
+        contiguous = _contiguous_group_index(keys, presorted)
+        if contiguous is not None:
+            codes, group_keys = contiguous
+            return GroupIndex(grouped_by, codes, group_keys, fingerprint, True)
+
+    grouped = df.groupby(grouped_by)
+    return GroupIndex(grouped_by, grouped.ngroup().values,
+                      grouped.size().index, fingerprint)
+
+
+def get_group_index(df):
+    """
+    Returns the `GroupIndex` of a grouped DataFrame, reusing the one carried
+    by the frame when it is still valid. Returns `None` if the grouping
+    cannot be indexed.
+    """
+
+    group_index = getattr(df, '_group_index', None)
+    if group_index is not None and group_index.is_valid_for(df):
+        return group_index
+    return build_group_index(df, df._grouped_by)
+
+
+def set_group_index(df, group_index):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        df._group_index = group_index
+
+
+def carry_group_index(source, result):
+    """
+    Attaches the group index of `source` to `result` if it is valid for it.
+    """
+
+    group_index = getattr(source, '_group_index', None)
+    if (group_index is not None and isinstance(result, pd.DataFrame) and
+            getattr(result, '_group_index', None) is None and
+            group_index.is_valid_for(result)):
+        set_group_index(result, group_index)
+
+
+def group_codes(df):
+    """
+    Returns the group number of every row of a grouped DataFrame, or `None`
+    if the grouping cannot be indexed (see `build_group_index`).
+    """
+
+    group_index = get_group_index(df)
+    return None if group_index is None else group_index.codes
+
+
+# ------------------------------------------------------------------------------
+# Intention expression compilation
+# ------------------------------------------------------------------------------
+
+_numexpr_arithmetic_operators = {
+    '__add__': '+', '__sub__': '-', '__mul__': '*', '__truediv__': '/',
+    '__radd__': '+', '__rsub__': '-', '__rmul__': '*', '__rtruediv__': '/',
+}
+
+_numexpr_comparison_operators = {
+    '__eq__': '==', '__ne__': '!=', '__lt__': '<', '__le__': '<=', '__gt__': '>',
+    '__ge__': '>=',
+}
+
+_numexpr_logical_operators = {'__and__': '&', '__or__': '|', '__rand__': '&', '__ror__': '|'}
+
+_numexpr_unary_operators = {'__neg__': '-{}', '__pos__': '+{}', '__abs__': 'abs({})'}
+
+# numexpr computes the operators above in these types like numpy does, apart
+# from abs, which it turns into floats. Powers are left to pandas: numexpr
+# rounds them differently, and integer powers can crash the interpreter.
+_numexpr_dtypes = set([np.dtype('bool'), np.dtype('int64'), np.dtype('float64')])
+
+
+def _numexpr_source(arg, df, local_dict, labels):
+    """
+    Returns the numexpr source of an Intention and the dtype kind of its
+    result ('b', 'i' or 'f'), or `(None, None)` if it cannot be compiled
+    to the result pandas gives.
+    """
+
+    if not isinstance(arg, Intention):
+        if isinstance(arg, (bool, int, float, np.bool_, np.int64, np.float64)):
+            name = '_c{}'.format(len(local_dict))
+            local_dict[name] = arg
+            return name, np.asarray(arg).dtype.kind
+        return None, None
+
+    label = intention_label(arg)
+    if label is not None:
+        if label not in df.columns or df[label].dtype not in _numexpr_dtypes:
+            return None, None
+        if label not in labels:
+            labels[label] = '_v{}'.format(len(local_dict))
+            local_dict[labels[label]] = df[label].values
+        return labels[label], df[label].dtype.kind
+
+    expression = arg.expression
+    if expression is None or expression[0] != 'method' or expression[4]:
+        return None, None
+
+    name, operands = expression[2], [expression[1]] + list(expression[3])
+    if len(operands) != (1 if name in _numexpr_unary_operators else 2):
+        return None, None
+    compiled = [_numexpr_source(a, df, local_dict, labels) for a in operands]
+    if any([source is None for source, kind in compiled]):
+        return None, None
+    sources = [source for source, kind in compiled]
+    kinds = set([kind for source, kind in compiled])
+    if name.startswith('__r'):
+        sources = sources[::-1]
+
+    if name in _numexpr_unary_operators:
+        if kinds - set('if') or (name == '__abs__' and kinds != set('f')):
+            return None, None
+        return _numexpr_unary_operators[name].format(*sources), kinds.pop()
+    if name in _numexpr_arithmetic_operators:
+        operator = _numexpr_arithmetic_operators[name]
+        if kinds - set('if'):
+            return None, None
+        kind = 'f' if operator == '/' or 'f' in kinds else 'i'
+        return '({} {} {})'.format(sources[0], operator, sources[1]), kind
+    if name in _numexpr_comparison_operators:
+        if kinds - set('if') and kinds != set('b'):
+            return None, None
+        operator = _numexpr_comparison_operators[name]
+        return '({} {} {})'.format(sources[0], operator, sources[1]), 'b'
+    if name in _numexpr_logical_operators:
+        if kinds != set('b'):
+            return None, None
+        operator = _numexpr_logical_operators[name]
+        return '({} {} {})'.format(sources[0], operator, sources[1]), 'b'
+    return None, None
+
+
+def compile_intention(arg, df):
+    """
+    Compiles an Intention made of arithmetic, comparison and boolean
+    operators on numeric columns into a single numexpr expression, which
+    avoids a temporary Series for every operator.
+
+    Args:
+        arg (Intention): the Intention to compile.
+        df (pandas.DataFrame): the DataFrame it will be evaluated against.
+
+    Returns:
+        A function evaluating the Intention against `df`, or `None` if
+        numexpr is not installed or the expression cannot be compiled.
+    """
+
+    if numexpr is None or not isinstance(arg, Intention):
+        return None
+    if arg.expression is None or arg.expression[0] != 'method':
+        return None
+
+    local_dict, labels = {}, {}
+    source, kind = _numexpr_source(arg, df, local_dict, labels)
+    if source is None:
+        return None
+
+    # pandas keeps a name only when every operand has the same one
+    name = list(labels.keys())[0] if len(labels) == 1 else None
+
+    def evaluate():
+        values = numexpr.evaluate(source, local_dict=local_dict)
+        return pd.Series(values, index=df.index, name=name)
+
+    return evaluate
 
 
 class pipe(object):
@@ -127,26 +1053,99 @@ class pipe(object):
 
         self.chained_pipes = []
 
+        # The verb and arguments this pipe was created from by calling a
+        # decorated function, so that pipe chains can be inspected.
+        self.verb = None
+        self.args = ()
+        self.kwargs = {}
+
+        self.executor = None
+
+    def using(self, executor):
+        """
+        Sets the `concurrent.futures.Executor` used to run the groups of a
+        grouped DataFrame (or the partitions of a partitioned join) in
+        parallel in this stage, overriding the `group_executor` option.
+        Returns the pipe.
+
+        Process pools need the verb and its arguments to be picklable, so
+        symbolic (`X`) arguments can only be used with thread pools.
+
+        Example:
+            with ThreadPoolExecutor(8) as pool:
+                df >> group_by(X.store) >> score_model(model).using(pool)
+        """
+
+        self.executor = executor
+        return self
+
     def __rshift__(self, other):
         assert isinstance(other, pipe)
         self.chained_pipes.append(other)
         return self
 
-    def __rrshift__(self, other):
-        other_copy = other.copy()
+    def stages(self):
+        """
+        Returns this pipe and all of the pipes chained to it, in the order
+        they are applied.
+        """
+
+        stages = [self]
+        for p in self.chained_pipes:
+            stages.extend(p.stages())
+        return stages
+
+    def apply_stage(self, other):
+        """
+        Applies this pipe to a DataFrame without the pipes chained to it.
+        """
+
+        # In copy-on-write mode the copy only duplicates the frame's
+        # structure, so the data is shared until a verb replaces a column.
+        other_copy = other.copy(deep=not options['copy_on_write'])
 
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             other_copy._grouped_by = getattr(other, '_grouped_by', None)
+            other_copy._group_executor = self.executor
+
+        # Only dfply's own verbs are known to replace rather than modify
+        # grouping columns, so other functions get frames without an index.
+        builtin = _is_builtin_verb(self)
+        group_index = getattr(other, '_group_index', None)
+        if builtin and group_index is not None and group_index.is_valid_for(other):
+            set_group_index(other_copy, group_index.rebind(other_copy))
 
         result = self.function(other_copy)
+        if builtin:
+            carry_group_index(other_copy, result)
+        return result
+
+    def __rrshift__(self, other):
+        result = self.apply_stage(other)
 
         for p in self.chained_pipes:
             result = p.__rrshift__(result)
         return result
 
     def __call__(self, *args, **kwargs):
-        return pipe(lambda x: self.function(x, *args, **kwargs))
+        called = pipe(lambda x: self.function(x, *args, **kwargs))
+        called.verb = self
+        called.args = args
+        called.kwargs = kwargs
+        return called
+
+
+def _is_builtin_verb(stage):
+    """
+    Returns True if a pipe stage applies a verb defined in dfply itself.
+    """
+
+    function = stage.verb if stage.verb is not None else stage
+    while hasattr(function, 'function'):
+        function = function.function
+    module = getattr(function, '__module__', None) or ''
+    return module.split('.')[0] == __name__.split('.')[0]
 
 
 class IntentionEvaluator(object):
@@ -160,7 +1159,8 @@ class IntentionEvaluator(object):
     __name__ = "IntentionEvaluator"
 
     def __init__(self, function, eval_symbols=True, eval_as_label=[],
-                 eval_as_selector=[]):
+                 eval_as_selector=[], compile_expressions=False,
+                 share_subexpressions=False):
         super(IntentionEvaluator, self).__init__()
         self.function = function
         self.__doc__ = function.__doc__
@@ -168,11 +1168,45 @@ class IntentionEvaluator(object):
         self.eval_symbols = eval_symbols
         self.eval_as_label = eval_as_label
         self.eval_as_selector = eval_as_selector
-
-    def _evaluate(self, df, arg):
+        self.compile_expressions = compile_expressions
+        self.share_subexpressions = share_subexpressions
+
+    def __reduce_ex__(self, protocol):
+        # decorated verbs replace the function they wrap in its module, so
+        # they are pickled as a reference to the module level verb
+        module = getattr(self.function, '__module__', None)
+        qualname = getattr(self.function, '__qualname__', None)
+        if module is not None and qualname is not None:
+            try:
+                if _find_evaluator(module, qualname) is self:
+                    return _find_evaluator, (module, qualname)
+            except Exception:
+                pass
+        return super(IntentionEvaluator, self).__reduce_ex__(protocol)
+
+    def _compiled(self, df, arg):
+        if not (self.compile_expressions and options['compile_expressions']):
+            return None
+        if df.shape[0] < options['compile_min_rows']:
+            return None
+        return compile_intention(arg, df)
+
+    def _evaluate(self, df, arg, cache=None):
         if isinstance(arg, Intention):
             negate = arg.inverted
-            arg = arg.evaluate(df)
+            compiled = self._compiled(df, arg)
+            try:
+                value = compiled() if compiled is not None else None
+            except Exception:
+                # fall back to the pandas operators, which raise the
+                # familiar error if the expression really is invalid
+                compiled = None
+            if compiled is not None:
+                arg = value
+            elif cache is not None:
+                arg = evaluate_expression(arg, df, cache)
+            else:
+                arg = arg.evaluate(df)
             if negate:
                 arg = ~arg
         return arg
@@ -224,8 +1258,8 @@ class IntentionEvaluator(object):
         else:
             return eval_func(df, arg)
 
-    def _symbolic_eval(self, df, arg):
-        return self._evaluator_loop(df, arg, self._evaluate)
+    def _symbolic_eval(self, df, arg, cache=None):
+        return self._evaluator_loop(df, arg, partial(self._evaluate, cache=cache))
 
     def _symbolic_to_label(self, df, arg):
         return self._evaluator_loop(df, arg, self._evaluate_label)
@@ -233,7 +1267,7 @@ class IntentionEvaluator(object):
     def _symbolic_to_selector(self, df, arg):
         return self._evaluator_loop(df, arg, self._evaluate_selector)
 
-    def _recursive_arg_eval(self, df, args):
+    def _recursive_arg_eval(self, df, args, cache=None):
         eval_symbols = self._find_eval_args(self.eval_symbols, args)
         eval_as_label = self._find_eval_args(self.eval_as_label, args)
         eval_as_selector = self._find_eval_args(self.eval_as_selector, args)
@@ -241,12 +1275,12 @@ class IntentionEvaluator(object):
         return [
             self._symbolic_to_label(df, a) if i in eval_as_label
             else self._symbolic_to_selector(df, a) if i in eval_as_selector
-            else self._symbolic_eval(df, a) if i in eval_symbols
+            else self._symbolic_eval(df, a, cache) if i in eval_symbols
             else a
             for i, a in enumerate(args)
         ]
 
-    def _recursive_kwarg_eval(self, df, kwargs):
+    def _recursive_kwarg_eval(self, df, kwargs, cache=None):
         eval_symbols = self._find_eval_kwargs(self.eval_symbols, kwargs)
         eval_as_label = self._find_eval_kwargs(self.eval_as_label, kwargs)
         eval_as_selector = self._find_eval_kwargs(self.eval_as_selector, kwargs)
@@ -254,7 +1288,7 @@ class IntentionEvaluator(object):
         return {
             k: (self._symbolic_to_label(df, v) if k in eval_as_label
                 else self._symbolic_to_selector(df, v) if k in eval_as_selector
-            else self._symbolic_eval(df, v) if k in eval_symbols
+            else self._symbolic_eval(df, v, cache) if k in eval_symbols
             else v)
             for k, v in kwargs.items()
         }
@@ -276,14 +1310,26 @@ class IntentionEvaluator(object):
     def __call__(self, *args, **kwargs):
         df = args[0]
 
-        args = self._recursive_arg_eval(df, args[1:])
-        kwargs = self._recursive_kwarg_eval(df, kwargs)
+        # subexpressions shared between arguments are evaluated once per call
+        cache = {} if self.share_subexpressions else None
+        args = self._recursive_arg_eval(df, args[1:], cache)
+        kwargs = self._recursive_kwarg_eval(df, kwargs, cache)
 
         return self.function(df, *args, **kwargs)
 
 
+def _find_evaluator(module, qualname):
+    verb = importlib.import_module(module)
+    for name in qualname.split('.'):
+        verb = getattr(verb, name)
+    while not isinstance(verb, IntentionEvaluator):
+        verb = verb.function
+    return verb
+
+
 def symbolic_evaluation(function=None, eval_symbols=True, eval_as_label=[],
-                        eval_as_selector=[]):
+                        eval_as_selector=[], compile_expressions=False,
+                        share_subexpressions=False):
     if function:
         return IntentionEvaluator(function)
     else:
@@ -291,11 +1337,42 @@ def symbolic_evaluation(function=None, eval_symbols=True, eval_as_label=[],
         def wrapper(function):
             return IntentionEvaluator(function, eval_symbols=eval_symbols,
                                       eval_as_label=eval_as_label,
-                                      eval_as_selector=eval_as_selector)
+                                      eval_as_selector=eval_as_selector,
+                                      compile_expressions=compile_expressions,
+                                      share_subexpressions=share_subexpressions)
 
         return wrapper
 
 
+def reset_group_index(df, applied):
+    """
+    Turns the result of applying a function to each group of `df` with
+    `groupby.apply` back into a DataFrame with the grouping columns as
+    regular columns, the way `group_delegation` returns it.
+
+    Args:
+        df (pandas.DataFrame): the grouped DataFrame.
+        applied (pandas.DataFrame): a DataFrame indexed by the group keys
+            followed by the index of each group's result.
+    """
+
+    # Save all the metadata attributes back into the new data frame
+    for field in df._metadata:
+        setattr(applied, field, getattr(df, field))
+    df = applied
+
+    for name in df.index.names[:-1]:
+        if name in df:
+            df.reset_index(level=0, drop=True, inplace=True)
+        else:
+            df.reset_index(level=0, inplace=True)
+
+    if (df.index == 0).all():
+        df.reset_index(drop=True, inplace=True)
+
+    return df
+
+
 class group_delegation(object):
     __name__ = "group_delegation"
 
@@ -303,32 +1380,80 @@ class group_delegation(object):
         self.function = function
         self.__doc__ = function.__doc__
 
-    def _apply(self, df, *args, **kwargs):
-        grouped = df.groupby(df._grouped_by)
-
-        dff = grouped.apply(self.function, *args, **kwargs)
-        # Save all the metadata attributes back into the new data frame
-        for field in df._metadata:
-            setattr(dff, field, getattr(df, field))
-        df = dff
-
-        for name in df.index.names[:-1]:
-            if name in df:
-                df.reset_index(level=0, drop=True, inplace=True)
-            else:
-                df.reset_index(level=0, inplace=True)
+        self.kernels = []
 
-        if (df.index == 0).all():
-            df.reset_index(drop=True, inplace=True)
+    def _apply(self, df, *args, **kwargs):
+        executor = getattr(df, '_group_executor', None) or options['group_executor']
+        if executor is None:
+            group_index = get_group_index(df)
+            if group_index is not None and group_index.contiguous:
+                return reset_group_index(
+                    df, self._apply_contiguous(df, group_index, *args, **kwargs))
 
-        return df
+        grouped = df.groupby(df._grouped_by)
+        if executor is None:
+            dff = grouped.apply(self.function, *args, **kwargs)
+        else:
+            dff = self._apply_parallel(grouped, executor, *args, **kwargs)
+        return reset_group_index(df, dff)
+
+    def _apply_contiguous(self, df, group_index, *args, **kwargs):
+        # groups of a frame sorted by its keys are slices of it, and their
+        # results are assembled like groupby.apply does it
+        groups, results = [], []
+        for key, rows in zip(group_index.keys, group_index.slices()):
+            group = df.iloc[rows]
+            # like the groups of groupby, a group is not a view to warn about
+            # when columns are assigned to it
+            group._is_copy = None
+            object.__setattr__(group, 'name', key)
+            groups.append(group)
+            results.append(self.function(group, *args, **kwargs))
+
+        if not all([isinstance(r, pd.DataFrame) and r.shape[0] > 0 for r in results]):
+            applied = dict(zip(group_index.keys, results))
+            return df.groupby(df._grouped_by).apply(lambda group: applied[group.name])
+
+        # rows of a sorted frame are already in group order, so results that
+        # keep the rows of their group need no reordering
+        if all([r.index.equals(g.index) for r, g in zip(results, groups)]):
+            return pd.concat(results)
+        return pd.concat(results, keys=group_index.keys,
+                         names=list(group_index.keys.names))
+
+    def _apply_parallel(self, grouped, executor, *args, **kwargs):
+        keys, groups = [], []
+        for key, group in grouped:
+            keys.append(key)
+            groups.append(group)
+
+        # run contiguous partitions of the groups as separate tasks, then
+        # let groupby.apply assemble the results exactly like it does when
+        # it runs the function itself
+        npartitions = min(len(groups), 4 * (os.cpu_count() or 1))
+        bounds = np.linspace(0, len(groups), npartitions + 1).astype(int)
+        partitions = [groups[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+        run = partial(_apply_partition, self.function, args, kwargs)
+        results = [r for partition in executor.map(run, partitions) for r in partition]
+
+        applied = dict(zip(keys, results))
+        return grouped.apply(lambda group: applied[group.name])
+
+    def _apply_kernels(self, df, *args, **kwargs):
+        for kernel in self.kernels:
+            applied = kernel(df, *args, **kwargs)
+            if applied is not None:
+                return applied
+        return None
 
     def __call__(self, *args, **kwargs):
         grouped_by = getattr(args[0], '_grouped_by', None)
         if (grouped_by is None) or not all([g in args[0].columns for g in grouped_by]):
             return self.function(*args, **kwargs)
         else:
-            applied = self._apply(args[0], *args[1:], **kwargs)
+            applied = self._apply_kernels(args[0], *args[1:], **kwargs)
+            if applied is None:
+                applied = self._apply(args[0], *args[1:], **kwargs)
 
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
@@ -337,6 +1462,65 @@ class group_delegation(object):
             return applied
 
 
+def _apply_partition(function, args, kwargs, groups):
+    return [function(group, *args, **kwargs) for group in groups]
+
+
+def grouped_kernel(kernel):
+    """
+    Adds a vectorized implementation of a verb for grouped DataFrames to a
+    `group_delegation` object. Kernels are tried in the order they are
+    added before falling back to applying the verb group by group.
+
+    A kernel is called with the grouped DataFrame and the verb's arguments
+    (not yet symbolically evaluated) and returns the same DataFrame that
+    group by group application would, or `None` if it cannot handle the
+    arguments.
+
+    Example:
+        @pipe
+        @grouped_kernel(_grouped_summarize)
+        @group_delegation
+        @symbolic_evaluation
+        def summarize(df, **kwargs):
+            ...
+    """
+
+    def decorator(delegation):
+        delegation.kernels.append(kernel)
+        return delegation
+
+    return decorator
+
+
+def group_invariant(delegation):
+    """
+    Marks a verb as giving the same result when applied to a whole grouped
+    DataFrame as when applied to each group separately, so that it runs
+    once on the whole frame. Use it above `@group_delegation`:
+
+        @pipe
+        @group_invariant
+        @group_delegation
+        @symbolic_evaluation
+        def myfunc(df, *args, **kwargs):
+            ...
+
+    Frames whose groups cannot be indexed, such as those with missing
+    grouping values, are still applied group by group, so that the rows
+    without a group are dropped like they are by the other verbs.
+    """
+
+    function = delegation.function
+
+    def kernel(df, *args, **kwargs):
+        if get_group_index(df) is None:
+            return None
+        return function(df, *args, **kwargs)
+
+    return grouped_kernel(kernel)(delegation)
+
+
 def dfpipe(f):
     return pipe(
         group_delegation(
@@ -2,13 +2,33 @@ from .base import *
 
 
 @pipe
-@symbolic_evaluation(eval_as_label=True)
-def group_by(df, *args):
+@symbolic_evaluation(eval_as_label=['*'])
+def group_by(df, *args, **kwargs):
+    """
+    Groups the DataFrame by the given columns, so that the verbs that follow
+    are applied to each group separately.
+
+    Args:
+        *args: the grouping columns, as symbolic or string labels.
+
+    Kwargs:
+        presorted (bool): declares that the DataFrame is already sorted by
+            the grouping columns, so that groups are taken as slices of the
+            frame without checking the order. Sorted frames are detected
+            without it, at the cost of one pass over the keys.
+
+    Example:
+        diamonds >> group_by(X.cut) >> summarize(price=mean(X.price))
+    """
+
     df._grouped_by = list(args)
+    set_group_index(df, build_group_index(df, df._grouped_by,
+                                          presorted=kwargs.get('presorted', False)))
     return df
 
 
 @pipe
 def ungroup(df):
     df._grouped_by = None
+    set_group_index(df, None)
     return df
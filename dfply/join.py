@@ -2,7 +2,7 @@ from .base import *
 
 
 # ------------------------------------------------------------------------------
-# SQL-style joins
+# Join parameters
 # ------------------------------------------------------------------------------
 
 def get_join_parameters(join_kwargs):
@@ -23,6 +23,500 @@ def get_join_parameters(join_kwargs):
     return left_on, right_on, suffixes
 
 
+# ------------------------------------------------------------------------------
+# Join indexes
+# ------------------------------------------------------------------------------
+
+def _key_codes(df, columns, levels):
+    # codes of the key columns in the distinct values of the right key
+    # columns, with missing values coded past them so that they match each
+    # other like in `merge`, and -1 for values that are not in the levels
+    codes = []
+    for column, level in zip(columns, levels):
+        values = df[column]
+        column_codes = level.get_indexer(values)
+        column_codes[pd.isnull(values).values] = len(level)
+        codes.append(column_codes)
+    if len(codes) == 1:
+        return pd.Index(codes[0])
+    return pd.MultiIndex.from_arrays(codes)
+
+
+def _take_rows(df, rows):
+    # rows at positions, with -1 filled with NaN and a default index
+    if len(rows) == df.shape[0] and np.array_equal(rows, np.arange(len(rows))):
+        taken = df.copy(deep=False)
+    elif len(rows) == 0 or rows.min() >= 0:
+        taken = df.take(rows)
+    else:
+        if not df.index.equals(pd.RangeIndex(df.shape[0])):
+            df = df.copy(deep=False)
+            df.index = pd.RangeIndex(df.shape[0])
+        taken = df.reindex(rows)
+    taken.index = pd.RangeIndex(len(rows))
+    return taken
+
+
+def _joined_frame(df, other, left_rows, right_rows, key_pairs, suffixes):
+    """
+    Builds the joined DataFrame from pairs of left and right row positions,
+    with missing rows (-1) filled with NaN like `merge` does. Right key
+    columns named like their left key are not repeated.
+    """
+
+    shared = [(l, r) for l, r in key_pairs if l == r and r in other.columns]
+    left = _take_rows(df, left_rows)
+    right = _take_rows(other.drop([r for l, r in shared], axis=1), right_rows)
+
+    # shared key columns of right rows without a left match keep the right key
+    if len(left_rows) and left_rows.min() < 0:
+        rows = np.where(left_rows >= 0, left_rows, df.shape[0] + right_rows)
+        for l, r in shared:
+            left[l] = pd.concat([df[l], other[r]], ignore_index=True).take(rows).values
+
+    overlap = set(left.columns) & set(right.columns)
+    left.columns = [c + suffixes[0] if c in overlap else c for c in left.columns]
+    right.columns = [c + suffixes[1] if c in overlap else c for c in right.columns]
+    return pd.concat([left, right], axis=1, copy=False)
+
+
+class JoinIndex(object):
+    """
+    The key index of a right DataFrame, built once so that repeated joins
+    against it only look up the keys of the left DataFrame. `inner_join`,
+    `left_join`, `semi_join` and `anti_join` accept a `JoinIndex` in place
+    of the right DataFrame and give the same result as joining with the
+    DataFrame. The keys are the `by` columns the index was prepared with.
+
+    Args:
+        other (pandas.DataFrame): the right DataFrame.
+        by (str or list): Columns to join on, as for the joins.
+    """
+
+    def __init__(self, other, by):
+        if by is None:
+            raise ValueError('A JoinIndex needs the by columns to join on')
+        left_on, right_on, suffixes = get_join_parameters({'by': by})
+        if not isinstance(left_on, list):
+            left_on, right_on = [left_on], [right_on]
+        self.by = by
+        self.left_on = left_on
+        self.right_on = right_on
+        self.frame = other.reset_index(drop=True)
+
+        # rows of every distinct key, in the order of the right DataFrame.
+        # The keys are indexed by the codes of their columns, which have no
+        # missing values for a MultiIndex to match loosely
+        self.levels = [pd.Index(pd.factorize(self.frame[c])[1]) for c in right_on]
+        right_keys = _key_codes(self.frame, right_on, self.levels)
+        self.keys = right_keys.unique()
+        codes = self.keys.get_indexer(right_keys)
+        self.rows = np.argsort(codes, kind='mergesort')
+        self.offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(codes, minlength=len(self.keys)))])
+
+    def lookup(self, df):
+        """
+        Returns the number of the distinct right key matching the key of
+        every row of `df`, or -1 for rows without a match.
+        """
+
+        return self.keys.get_indexer(_key_codes(df, self.left_on, self.levels))
+
+    def matches(self, keys, how='inner'):
+        """
+        Returns the pairs of left and right row positions matching the key
+        numbers `keys` from `lookup`, ordered by left and then right row.
+        With `how='left'`, left rows without a match are paired with -1.
+        """
+
+        matched = keys >= 0
+        counts = np.where(matched, self.offsets[keys + 1] - self.offsets[keys], 0)
+        if how == 'left':
+            counts = np.maximum(counts, 1)
+
+        left_rows = np.repeat(np.arange(len(keys)), counts)
+        within = np.arange(len(left_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        right_rows = np.where(matched[left_rows],
+                              self.rows[np.minimum(self.offsets[keys[left_rows]] + within,
+                                                   len(self.rows) - 1)], -1)
+        return left_rows, right_rows
+
+    def join(self, df, how='inner', suffixes=('_x', '_y')):
+        """
+        Joins `df` to the indexed DataFrame like `merge` does, with `how`
+        one of `'inner'` or `'left'`.
+        """
+
+        if df.shape[0] == 0 or self.frame.shape[0] == 0:
+            # merge lays out joins with an empty side in its own way
+            return df.merge(self.frame, how=how, left_on=self.left_on,
+                            right_on=self.right_on, suffixes=suffixes)
+
+        keys = self.lookup(df)
+        left_rows, right_rows = self.matches(keys, how)
+        if how == 'inner':
+            # merge orders inner joins by the first appearance of each key
+            # in the left DataFrame
+            appearance = pd.factorize(keys)[0]
+            order = np.lexsort((left_rows, appearance[left_rows]))
+            left_rows, right_rows = left_rows[order], right_rows[order]
+        return _joined_frame(df, self.frame, left_rows, right_rows,
+                             list(zip(self.left_on, self.right_on)), suffixes)
+
+
+def prepare_join(other, by):
+    """
+    Builds the `JoinIndex` of a DataFrame for repeated joins against it.
+
+    Args:
+        other (pandas.DataFrame): the right DataFrame.
+        by (str or list): Columns to join on, as for the joins.
+
+    Example:
+        products = prepare_join(product_table, by='product_id')
+        orders >> left_join(products)
+    """
+
+    return JoinIndex(other, by)
+
+
+# ------------------------------------------------------------------------------
+# Packed join keys
+# ------------------------------------------------------------------------------
+
+def pack_join_keys(left, right):
+    """
+    Factorizes the key columns of both sides of a join into shared integer
+    codes and packs the codes of all columns into a single int64 key, so
+    that rows have equal packed keys exactly when all of their key columns
+    are equal (missing values included, like in `merge`). Returns the
+    packed keys of the left and right rows.
+
+    Args:
+        left (pandas.DataFrame): the key columns of the left DataFrame.
+        right (pandas.DataFrame): the key columns of the right DataFrame,
+            in the same order.
+    """
+
+    nleft = left.shape[0]
+    keys = np.zeros(nleft + right.shape[0], dtype=np.int64)
+    size = 1
+    for i in range(left.shape[1]):
+        codes, uniques = pd.factorize(pd.concat([left.iloc[:, i], right.iloc[:, i]],
+                                                ignore_index=True))
+        codes[codes < 0] = len(uniques)
+        if size * (len(uniques) + 1) >= 2 ** 63:
+            # renumber the keys packed so far to keep the product in range
+            keys, packed = pd.factorize(keys)
+            size = len(packed)
+        keys = keys * (len(uniques) + 1) + codes
+        size *= len(uniques) + 1
+    return keys[:nleft], keys[nleft:]
+
+
+# ------------------------------------------------------------------------------
+# Partitioned joins
+# ------------------------------------------------------------------------------
+
+def _key_columns(df, other, left_on, right_on):
+    # the lists of key columns of both sides, by default the shared columns
+    if left_on is None:
+        left_on = right_on = [c for c in df.columns if c in other.columns]
+        if not left_on:
+            return None
+    if not isinstance(left_on, list):
+        left_on, right_on = [left_on], [right_on]
+    return left_on, right_on
+
+
+def _join_partition(how, nleft, left, right):
+    """
+    Joins the packed keys of one partition of each side, returning the left
+    and right row positions of the joined rows (-1 where missing) and, for
+    inner and outer joins, the first row of every key that `merge` orders
+    the joined rows by.
+    """
+
+    joined = left.merge(right, how=how, on='k')
+    left_rows = joined['l'].fillna(-1).values.astype(np.int64)
+    right_rows = joined['r'].fillna(-1).values.astype(np.int64)
+    if how not in ('inner', 'outer'):
+        return left_rows, right_rows, None
+
+    first = pd.Series(np.where(left_rows >= 0, left_rows, nleft + right_rows))
+    return left_rows, right_rows, first.groupby(joined['k'].values).transform('min').values
+
+
+def _partition_keys(keys, partitions, position):
+    # packed keys are numbered in order of appearance, so their remainders
+    # spread the keys evenly; small integer codes are sorted with a radix sort
+    codes = (keys % partitions).astype(np.min_scalar_type(partitions))
+    rows = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=partitions))])
+    return [pd.DataFrame({'k': keys[rows[start:stop]], position: rows[start:stop]})
+            for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def partitioned_join(df, other, how, join_kwargs, partitions, executor=None):
+    """
+    Joins two DataFrames like `merge` does by hash partitioning both sides
+    on the join keys and joining the partitions separately, in parallel when
+    an executor is given. Only the key columns are partitioned and the
+    partitions return row positions, so the full DataFrames are neither
+    copied into the tasks nor pickled for process pools. The joined rows
+    are put back in the order `merge` returns them.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame.
+        other (pandas.DataFrame): Right DataFrame.
+        how (str): `'inner'`, `'left'`, `'right'` or `'outer'`.
+        join_kwargs (dict): the `by` and `suffixes` keyword arguments of
+            the join.
+        partitions (int): number of partitions.
+
+    Kwargs:
+        executor (concurrent.futures.Executor): executor to join the
+            partitions with, or None to join them one after the other.
+    """
+
+    left_on, right_on, suffixes = get_join_parameters(join_kwargs)
+    keys = _key_columns(df, other, left_on, right_on)
+    if keys is None:
+        raise pd.errors.MergeError('No common columns to perform merge on')
+    left_on, right_on = keys
+    if df.shape[0] == 0 or other.shape[0] == 0:
+        # merge lays out joins with an empty side in its own way, which
+        # costs nothing to follow
+        return df.merge(other, how=how, left_on=left_on, right_on=right_on,
+                        suffixes=suffixes)
+    # let merge check that the keys can be joined
+    df.iloc[:0].merge(other.iloc[:0], how=how, left_on=left_on, right_on=right_on)
+
+    left_keys, right_keys = pack_join_keys(df[left_on], other[right_on])
+    lefts = _partition_keys(left_keys, partitions, 'l')
+    rights = _partition_keys(right_keys, partitions, 'r')
+    run = partial(_join_partition, how, df.shape[0])
+    joined = list((executor.map if executor is not None else map)(run, lefts, rights))
+
+    # every partition is already in merge order and the partitions hold
+    # different keys, so a stable sort on the leading sort key interleaves
+    # them in the order of the whole join
+    left_rows = np.concatenate([j[0] for j in joined])
+    right_rows = np.concatenate([j[1] for j in joined])
+    if how == 'left':
+        order = np.argsort(left_rows, kind='stable')
+    elif how == 'right':
+        order = np.argsort(right_rows, kind='stable')
+    else:
+        order = np.argsort(np.concatenate([j[2] for j in joined]), kind='stable')
+    return _joined_frame(df, other, left_rows[order], right_rows[order],
+                         list(zip(left_on, right_on)), suffixes)
+
+
+# ------------------------------------------------------------------------------
+# Sort-merge joins
+# ------------------------------------------------------------------------------
+
+def _sorted_join_keys(df, other, left_on, right_on, presorted=None):
+    """
+    Returns the values of the key columns of both sides when the join is
+    on a single numeric or datetime key that both sides are sorted by in
+    ascending order, without missing keys, and None otherwise. Sortedness
+    is checked unless `presorted` declares it (True) or rules it out
+    (False).
+    """
+
+    if presorted is False or left_on is None:
+        return None
+    if isinstance(left_on, list):
+        if len(left_on) != 1:
+            return None
+        left_on, right_on = left_on[0], right_on[0]
+    left, right = df[left_on], other[right_on]
+    if not isinstance(left, pd.Series) or not isinstance(right, pd.Series):
+        return None
+    if left.empty or right.empty:
+        return None
+
+    kinds = set([left.dtype.kind, right.dtype.kind])
+    if not (kinds <= set('iuf') or (kinds == set('M') and left.dtype == right.dtype)):
+        return None
+    if left.hasnans or right.hasnans:
+        return None
+    if not presorted and not (left.is_monotonic_increasing and right.is_monotonic_increasing):
+        return None
+    return left.values, right.values
+
+
+def sort_merge_positions(left_keys, right_keys, how):
+    """
+    Returns the left and right row positions (-1 where missing) of a join
+    of two sorted key arrays, found by binary search through the sorted
+    right keys instead of a hash table. The joined rows are in key order,
+    which for inner, left and right joins is the order `merge` returns;
+    right rows of an outer join without a left match are placed in key
+    order too, as `merge(sort=True)` does.
+
+    Args:
+        left_keys (numpy.ndarray): the sorted keys of the left rows.
+        right_keys (numpy.ndarray): the sorted keys of the right rows.
+        how (str): `'inner'`, `'left'`, `'right'` or `'outer'`.
+    """
+
+    if how == 'right':
+        right_rows, left_rows = sort_merge_positions(right_keys, left_keys, 'left')
+        return left_rows, right_rows
+
+    starts = np.searchsorted(right_keys, left_keys, side='left')
+    counts = np.searchsorted(right_keys, left_keys, side='right') - starts
+    matched = counts > 0
+    if how != 'inner':
+        counts = np.maximum(counts, 1)
+
+    left_rows = np.repeat(np.arange(len(left_keys)), counts)
+    within = np.arange(len(left_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_rows = np.where(matched[left_rows], starts[left_rows] + within, -1)
+    if how != 'outer':
+        return left_rows, right_rows
+
+    unmatched = np.flatnonzero(np.searchsorted(left_keys, right_keys, side='left') ==
+                               np.searchsorted(left_keys, right_keys, side='right'))
+    positions = np.searchsorted(left_keys[left_rows], right_keys[unmatched], side='left')
+    return (np.insert(left_rows, positions, -1),
+            np.insert(right_rows, positions, unmatched))
+
+
+# ------------------------------------------------------------------------------
+# Join size checks
+# ------------------------------------------------------------------------------
+
+_validations = {
+    'one_to_one': (True, True), '1:1': (True, True),
+    'one_to_many': (True, False), '1:m': (True, False),
+    'many_to_one': (False, True), 'm:1': (False, True),
+    'many_to_many': (False, False), 'm:m': (False, False),
+}
+
+
+def _join_key_counts(df, other, join_kwargs):
+    # the number of left and right rows of every distinct key of either side
+    left_on, right_on, suffixes = get_join_parameters(join_kwargs)
+    keys = _key_columns(df, other, left_on, right_on)
+    if keys is None:
+        raise pd.errors.MergeError('No common columns to perform merge on')
+    left_keys, right_keys = pack_join_keys(df[keys[0]], other[keys[1]])
+    codes, uniques = pd.factorize(np.concatenate([left_keys, right_keys]))
+    left_counts = np.bincount(codes[:df.shape[0]], minlength=len(uniques))
+    right_counts = np.bincount(codes[df.shape[0]:], minlength=len(uniques))
+    return left_counts, right_counts
+
+
+def join_cardinality(df, other, how='inner', **kwargs):
+    """
+    Returns the number of rows a join of two DataFrames returns, counted
+    from the number of rows of every key on both sides without joining.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame.
+        other (pandas.DataFrame): Right DataFrame.
+        how (str): `'inner'`, `'left'`, `'right'` or `'outer'`.
+
+    Kwargs:
+        by (str or list): Columns to join on, as for the joins.
+    """
+
+    left_counts, right_counts = _join_key_counts(df, other, kwargs)
+    return _joined_rows(left_counts, right_counts, how)
+
+
+def _joined_rows(left_counts, right_counts, how):
+    rows = int(np.dot(left_counts, right_counts))
+    if how in ('left', 'outer'):
+        rows += int(left_counts[right_counts == 0].sum())
+    if how in ('right', 'outer'):
+        rows += int(right_counts[left_counts == 0].sum())
+    return rows
+
+
+def _check_join(df, other, how, kwargs):
+    """
+    Raises a `MergeError` before a join when the keys are not unique on a
+    side that `validate` requires to be, or when the join would return more
+    rows or (estimated) bytes than the `max_rows` and `max_bytes` keyword
+    arguments or the `join_max_rows` and `join_max_bytes` options allow.
+    """
+
+    validate = kwargs.get('validate')
+    max_rows = kwargs.get('max_rows', options['join_max_rows'])
+    max_bytes = kwargs.get('max_bytes', options['join_max_bytes'])
+    if validate is None and max_rows is None and max_bytes is None:
+        return
+    if validate is not None and validate not in _validations:
+        raise ValueError('"{}" is not a valid argument for validate'.format(validate))
+
+    left_counts, right_counts = _join_key_counts(df, other, kwargs)
+    if validate is not None:
+        # the same errors as merge raises
+        unique_left, unique_right = _validations[validate]
+        name = ['many-to-many', 'many-to-one', 'one-to-many', 'one-to-one'][
+            2 * unique_left + unique_right]
+        duplicated = [side for side, unique, counts in [('left', unique_left, left_counts),
+                                                        ('right', unique_right, right_counts)]
+                      if unique and (counts > 1).any()]
+        if duplicated:
+            raise pd.errors.MergeError('Merge keys are not unique in {} dataset; not a {} merge'.format(
+                'either left or right' if len(duplicated) == 2 else duplicated[0], name))
+
+    rows = _joined_rows(left_counts, right_counts, how)
+    if max_rows is not None and rows > max_rows:
+        raise pd.errors.MergeError(
+            'The {} join would return {} rows, more than the limit of {} rows; '
+            'check the by columns'.format(how, rows, max_rows))
+    if max_bytes is not None:
+        # bytes per row of the columns themselves, without the objects
+        # that object columns point to
+        row_bytes = sum([frame.memory_usage(index=False).sum() / max(frame.shape[0], 1)
+                         for frame in (df, other)])
+        if rows * row_bytes > max_bytes:
+            raise pd.errors.MergeError(
+                'The {} join would return {} rows of about {:.0f} bytes, more than '
+                'the limit of {} bytes; check the by columns'.format(
+                    how, rows, rows * row_bytes, max_bytes))
+
+
+# ------------------------------------------------------------------------------
+# SQL-style joins
+# ------------------------------------------------------------------------------
+
+def _join(df, other, how, kwargs):
+    index = None
+    if isinstance(other, JoinIndex):
+        index, other = other, other.frame
+        kwargs = dict(kwargs, by=index.by)
+    _check_join(df, other, how, kwargs)
+    if index is not None and how in ('inner', 'left'):
+        return index.join(df, how=how, suffixes=kwargs.get('suffixes', ('_x', '_y')))
+    if kwargs.get('partitions'):
+        executor = getattr(df, '_group_executor', None) or options['group_executor']
+        return partitioned_join(df, other, how, kwargs, kwargs['partitions'], executor)
+
+    left_on, right_on, suffixes = get_join_parameters(kwargs)
+    # outer joins only keep the sorted order when asked to, since merge
+    # puts the right rows without a match last
+    presorted = kwargs.get('presorted', None if how != 'outer' else False)
+    keys = _sorted_join_keys(df, other, left_on, right_on, presorted)
+    if keys is not None:
+        left_rows, right_rows = sort_merge_positions(keys[0], keys[1], how)
+        key_pairs = [(left_on, right_on)] if not isinstance(left_on, list) \
+            else list(zip(left_on, right_on))
+        return _joined_frame(df, other, left_rows, right_rows, key_pairs, suffixes)
+
+    joined = df.merge(other, how=how, left_on=left_on,
+                      right_on=right_on, suffixes=suffixes)
+    return joined
+
+
 @pipe
 def inner_join(df, other, **kwargs):
     """
@@ -30,7 +524,8 @@ def inner_join(df, other, **kwargs):
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame or JoinIndex): Right DataFrame, or its
+            `JoinIndex` from `prepare_join`
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
@@ -38,6 +533,21 @@ def inner_join(df, other, **kwargs):
             integers, the right/left columns to join on.
         suffixes (list): String suffixes to append to column names in left
             and right DataFrames.
+        partitions (int): join in this many hash partitions of the keys,
+            in parallel with the executor set with `pipe.using` or the
+            `group_executor` option (see `partitioned_join`).
+        presorted (bool): declares that both DataFrames are sorted by a
+            single numeric or datetime join key, which is otherwise
+            detected, to join them with a sort-merge join (False disables
+            it). Outer joins only use it when declared, and then return the
+            rows in key order.
+        validate (str): checks that the keys are unique on the left and/or
+            right side, as `'one_to_one'`, `'one_to_many'`, `'many_to_one'`
+            or `'many_to_many'` (no check), like `merge` does.
+        max_rows (int): raise a `MergeError` before joining when the join
+            would return more rows (default: the `join_max_rows` option).
+        max_bytes (int): raise a `MergeError` before joining when the
+            result would be larger (default: the `join_max_bytes` option).
 
     Example:
         a >> inner_join(b, by='x1')
@@ -47,10 +557,7 @@ def inner_join(df, other, **kwargs):
         1  B   2  False
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    joined = df.merge(other, how='inner', left_on=left_on,
-                      right_on=right_on, suffixes=suffixes)
-    return joined
+    return _join(df, other, 'inner', kwargs)
 
 
 @pipe
@@ -60,7 +567,8 @@ def full_join(df, other, **kwargs):
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame or JoinIndex): Right DataFrame, or its
+            `JoinIndex` from `prepare_join`
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
@@ -68,6 +576,21 @@ def full_join(df, other, **kwargs):
             integers, the right/left columns to join on.
         suffixes (list): String suffixes to append to column names in left
             and right DataFrames.
+        partitions (int): join in this many hash partitions of the keys,
+            in parallel with the executor set with `pipe.using` or the
+            `group_executor` option (see `partitioned_join`).
+        presorted (bool): declares that both DataFrames are sorted by a
+            single numeric or datetime join key, which is otherwise
+            detected, to join them with a sort-merge join (False disables
+            it). Outer joins only use it when declared, and then return the
+            rows in key order.
+        validate (str): checks that the keys are unique on the left and/or
+            right side, as `'one_to_one'`, `'one_to_many'`, `'many_to_one'`
+            or `'many_to_many'` (no check), like `merge` does.
+        max_rows (int): raise a `MergeError` before joining when the join
+            would return more rows (default: the `join_max_rows` option).
+        max_bytes (int): raise a `MergeError` before joining when the
+            result would be larger (default: the `join_max_bytes` option).
 
     Example:
         a >> outer_join(b, by='x1')
@@ -79,10 +602,7 @@ def full_join(df, other, **kwargs):
         3  D  NaN   True
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    joined = df.merge(other, how='outer', left_on=left_on,
-                      right_on=right_on, suffixes=suffixes)
-    return joined
+    return _join(df, other, 'outer', kwargs)
 
 
 @pipe
@@ -92,7 +612,8 @@ def outer_join(df, other, **kwargs):
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame or JoinIndex): Right DataFrame, or its
+            `JoinIndex` from `prepare_join`
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
@@ -100,6 +621,21 @@ def outer_join(df, other, **kwargs):
             integers, the right/left columns to join on.
         suffixes (list): String suffixes to append to column names in left
             and right DataFrames.
+        partitions (int): join in this many hash partitions of the keys,
+            in parallel with the executor set with `pipe.using` or the
+            `group_executor` option (see `partitioned_join`).
+        presorted (bool): declares that both DataFrames are sorted by a
+            single numeric or datetime join key, which is otherwise
+            detected, to join them with a sort-merge join (False disables
+            it). Outer joins only use it when declared, and then return the
+            rows in key order.
+        validate (str): checks that the keys are unique on the left and/or
+            right side, as `'one_to_one'`, `'one_to_many'`, `'many_to_one'`
+            or `'many_to_many'` (no check), like `merge` does.
+        max_rows (int): raise a `MergeError` before joining when the join
+            would return more rows (default: the `join_max_rows` option).
+        max_bytes (int): raise a `MergeError` before joining when the
+            result would be larger (default: the `join_max_bytes` option).
 
     Example:
         a >> full_join(b, by='x1')
@@ -111,10 +647,7 @@ def outer_join(df, other, **kwargs):
         3  D  NaN   True
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    joined = df.merge(other, how='outer', left_on=left_on,
-                      right_on=right_on, suffixes=suffixes)
-    return joined
+    return _join(df, other, 'outer', kwargs)
 
 
 @pipe
@@ -124,7 +657,8 @@ def left_join(df, other, **kwargs):
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame or JoinIndex): Right DataFrame, or its
+            `JoinIndex` from `prepare_join`
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
@@ -132,6 +666,21 @@ def left_join(df, other, **kwargs):
             integers, the right/left columns to join on.
         suffixes (list): String suffixes to append to column names in left
             and right DataFrames.
+        partitions (int): join in this many hash partitions of the keys,
+            in parallel with the executor set with `pipe.using` or the
+            `group_executor` option (see `partitioned_join`).
+        presorted (bool): declares that both DataFrames are sorted by a
+            single numeric or datetime join key, which is otherwise
+            detected, to join them with a sort-merge join (False disables
+            it). Outer joins only use it when declared, and then return the
+            rows in key order.
+        validate (str): checks that the keys are unique on the left and/or
+            right side, as `'one_to_one'`, `'one_to_many'`, `'many_to_one'`
+            or `'many_to_many'` (no check), like `merge` does.
+        max_rows (int): raise a `MergeError` before joining when the join
+            would return more rows (default: the `join_max_rows` option).
+        max_bytes (int): raise a `MergeError` before joining when the
+            result would be larger (default: the `join_max_bytes` option).
 
     Example:
         a >> left_join(b, by='x1')
@@ -142,10 +691,7 @@ def left_join(df, other, **kwargs):
         2  C   3    NaN
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    joined = df.merge(other, how='left', left_on=left_on,
-                      right_on=right_on, suffixes=suffixes)
-    return joined
+    return _join(df, other, 'left', kwargs)
 
 
 @pipe
@@ -155,7 +701,8 @@ def right_join(df, other, **kwargs):
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame or JoinIndex): Right DataFrame, or its
+            `JoinIndex` from `prepare_join`
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
@@ -163,6 +710,21 @@ def right_join(df, other, **kwargs):
             integers, the right/left columns to join on.
         suffixes (list): String suffixes to append to column names in left
             and right DataFrames.
+        partitions (int): join in this many hash partitions of the keys,
+            in parallel with the executor set with `pipe.using` or the
+            `group_executor` option (see `partitioned_join`).
+        presorted (bool): declares that both DataFrames are sorted by a
+            single numeric or datetime join key, which is otherwise
+            detected, to join them with a sort-merge join (False disables
+            it). Outer joins only use it when declared, and then return the
+            rows in key order.
+        validate (str): checks that the keys are unique on the left and/or
+            right side, as `'one_to_one'`, `'one_to_many'`, `'many_to_one'`
+            or `'many_to_many'` (no check), like `merge` does.
+        max_rows (int): raise a `MergeError` before joining when the join
+            would return more rows (default: the `join_max_rows` option).
+        max_bytes (int): raise a `MergeError` before joining when the
+            result would be larger (default: the `join_max_bytes` option).
 
     Example:
         a >> right_join(b, by='x1')
@@ -173,26 +735,266 @@ def right_join(df, other, **kwargs):
         2  D  NaN   True
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    joined = df.merge(other, how='right', left_on=left_on,
-                      right_on=right_on, suffixes=suffixes)
-    return joined
+    return _join(df, other, 'right', kwargs)
+
+
+@pipe
+def star_join(df, dims, **kwargs):
+    """
+    Left joins several dimension tables to a (fact) DataFrame at once. The
+    keys of every dimension are looked up in the left DataFrame and the
+    columns of each dimension are gathered with a single `take`, so the
+    left DataFrame is copied once instead of once per join. The result is
+    the same as chaining `left_join`s in the order of `dims`.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame (passed in via pipe)
+        dims (dict or list): the dimension tables, as a dict mapping the
+            `by` argument of each join to its DataFrame (or `JoinIndex`), or
+            as a list of `JoinIndex` from `prepare_join`.
+
+    Kwargs:
+        suffixes (list): String suffixes to append to column names in left
+            and right DataFrames.
+
+    Example:
+        sales >> star_join({'product_id': products, 'store_id': stores})
+    """
+
+    if isinstance(dims, dict):
+        dims = [dim if isinstance(dim, JoinIndex) else prepare_join(dim, by)
+                for by, dim in dims.items()]
+    else:
+        dims = list(dims)
+
+    # dimensions keyed on columns of earlier dimensions, or sharing column
+    # names that the joins would suffix, are joined one after the other
+    columns = list(df.columns)
+    chained = False
+    for index in dims:
+        added = [c for c in index.frame.columns
+                 if c not in [r for l, r in zip(index.left_on, index.right_on) if l == r]]
+        chained |= not set(index.left_on) <= set(df.columns)
+        chained |= bool(set(columns) & set(added))
+        columns += added
+    if chained:
+        for index in dims:
+            df = df >> left_join(index, **kwargs)
+        return df
+
+    positions = np.arange(df.shape[0])
+    gathered = []
+    for index in dims:
+        left_rows, right_rows = index.matches(index.lookup(df)[positions], how='left')
+        positions = positions[left_rows]
+        gathered = [rows[left_rows] for rows in gathered] + [right_rows]
+
+    parts = [df.take(positions).reset_index(drop=True)]
+    for index, rows in zip(dims, gathered):
+        keys = [r for l, r in zip(index.left_on, index.right_on) if l == r]
+        parts.append(index.frame.drop(keys, axis=1).reindex(rows).reset_index(drop=True))
+    return pd.concat(parts, axis=1)
+
+
+def get_membership_keys(df, other, join_kwargs):
+    """
+    Returns the lists of columns of the left and right DataFrames that
+    `semi_join` and `anti_join` match on, defaulting to the columns the
+    DataFrames have in common.
+    """
+
+    left_on, right_on, suffixes = get_join_parameters(join_kwargs)
+    if not right_on:
+        right_on = [col_name for col_name in df.columns.values.tolist() if col_name in other.columns.values.tolist()]
+        left_on = right_on
+    if not isinstance(right_on, (list, tuple)):
+        right_on = [right_on]
+    if not isinstance(left_on, (list, tuple)):
+        left_on = [left_on]
+    return list(left_on), list(right_on)
+
+
+def key_membership(df, other, left_on, right_on):
+    """
+    Returns a boolean array that is True for the rows of `df` whose key has
+    a match in `other`, matching keys the way `merge` does (missing values
+    match each other). Composite keys are matched as packed integer keys
+    (see `pack_join_keys`), with only the distinct keys of `other`.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame.
+        other (pandas.DataFrame): Right DataFrame.
+        left_on (list): key columns of the left DataFrame.
+        right_on (list): key columns of the right DataFrame.
+    """
+
+    if len(left_on) != len(right_on):
+        raise ValueError('len(right_on) must equal len(left_on)')
+    if len(left_on) == 1:
+        return df[left_on[0]].isin(other[right_on[0]].unique()).values
+
+    left_keys, right_keys = pack_join_keys(df[left_on], other[right_on].drop_duplicates())
+    return pd.Series(left_keys).isin(right_keys).values
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter over 64-bit key hashes: a set of keys that answers
+    membership queries without false negatives, with a false positive
+    rate set by its size.
+
+    Args:
+        nbits (int): number of bits of the filter.
+        nhashes (int): number of bits set for each key.
+    """
+
+    def __init__(self, nbits, nhashes):
+        self.nbits = max(8, int(nbits))
+        self.nhashes = max(1, int(nhashes))
+        self.bits = np.zeros((self.nbits + 7) // 8, dtype=np.uint8)
+
+    @classmethod
+    def for_keys(cls, nkeys, false_positive_rate=0.01, max_bytes=None):
+        """
+        Returns a filter sized for `nkeys` keys at the given false positive
+        rate, or the best filter that fits in `max_bytes` bytes.
+        """
+
+        nkeys = max(1, nkeys)
+        nbits = np.ceil(-nkeys * np.log(false_positive_rate) / np.log(2) ** 2)
+        if max_bytes is not None:
+            nbits = min(nbits, 8 * max_bytes)
+        return cls(nbits, round(nbits / nkeys * np.log(2)))
+
+    def _positions(self, hashes):
+        # double hashing: bit i of a key is h1 + i * h2
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        step = (hashes >> np.uint64(32)) | np.uint64(1)
+        with np.errstate(over='ignore'):
+            return [(hashes + np.uint64(i) * step) % np.uint64(self.nbits)
+                    for i in range(self.nhashes)]
+
+    def add(self, hashes):
+        for positions in self._positions(hashes):
+            positions = np.unique(positions)
+            byte = (positions >> np.uint64(3)).astype(np.int64)
+            bit = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(byte)) + 1])
+            self.bits[byte[starts]] |= np.bitwise_or.reduceat(bit, starts)
+
+    def might_contain(self, hashes):
+        found = np.ones(len(hashes), dtype=bool)
+        for positions in self._positions(hashes):
+            byte = (positions >> np.uint64(3)).astype(np.int64)
+            bit = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+            found &= (self.bits[byte] & bit) > 0
+        return found
+
+
+def _hash_keys(keys):
+    # numbers are hashed as floats so that keys match across numeric dtypes,
+    # like they do in merge, and adding 0.0 turns -0.0 into 0.0, which
+    # compares equal to it but hashes differently
+    keys = keys.copy()
+    keys.columns = range(keys.shape[1])
+    for column in keys.columns:
+        if keys[column].dtype.kind in 'iuf':
+            keys[column] = keys[column].astype(np.float64) + 0.0
+    return pd.util.hash_pandas_object(keys, index=False).values
+
+
+def _chunk_source(other):
+    if callable(other):
+        return other
+    if isinstance(other, (list, tuple)):
+        return lambda: iter(other)
+    raise TypeError('The right side of a chunked join must be a DataFrame, a list '
+                    'of DataFrames or a function returning an iterable of '
+                    'DataFrames, since it is read more than once')
+
+
+def chunked_key_membership(df, other, join_kwargs, false_positive_rate=0.01,
+                           memory_budget=None, expected_keys=None):
+    """
+    Like `key_membership`, for a right side that is read in chunks. A Bloom
+    filter of the right keys is built chunk by chunk and probed with the
+    left keys. Possible matches are then checked exactly in a second pass
+    over the right chunks. Without `expected_keys`, the right chunks are
+    read once more beforehand to count the rows.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame.
+        other: a function returning an iterable of DataFrames, or a list of
+            DataFrames.
+        join_kwargs (dict): the `by` keyword argument of the join.
+
+    Kwargs:
+        false_positive_rate (float): target false positive rate of the
+            Bloom filter.
+        memory_budget (int): maximum size of the Bloom filter in bytes.
+        expected_keys (int): number of right keys to size the filter for.
+    """
+
+    chunks = _chunk_source(other)
+    left_on = right_on = None
+    if expected_keys is None:
+        expected_keys = sum([chunk.shape[0] for chunk in chunks()])
+
+    bloom = BloomFilter.for_keys(expected_keys, false_positive_rate, memory_budget)
+    for chunk in chunks():
+        if right_on is None:
+            left_on, right_on = get_membership_keys(df, chunk, join_kwargs)
+        bloom.add(_hash_keys(chunk[right_on]))
+    if right_on is None:
+        return np.zeros(df.shape[0], dtype=bool)
+
+    candidates = bloom.might_contain(_hash_keys(df[left_on]))
+    candidate_keys = df.loc[candidates, left_on].drop_duplicates()
+    found = np.zeros(candidate_keys.shape[0], dtype=bool)
+    for chunk in chunks():
+        found |= key_membership(candidate_keys, chunk, left_on, right_on)
+
+    matched = np.zeros(df.shape[0], dtype=bool)
+    matched[candidates] = key_membership(df[candidates], candidate_keys[found],
+                                         left_on, left_on)
+    return matched
+
+
+def _membership(df, other, kwargs):
+    if isinstance(other, JoinIndex):
+        return other.lookup(df) >= 0
+    if isinstance(other, pd.DataFrame):
+        left_on, right_on = get_membership_keys(df, other, kwargs)
+        return key_membership(df, other, left_on, right_on)
+    filter_kwargs = {k: v for k, v in kwargs.items()
+                     if k in ('false_positive_rate', 'memory_budget', 'expected_keys')}
+    return chunked_key_membership(df, other, kwargs, **filter_kwargs)
 
 
 @pipe
 def semi_join(df, other, **kwargs):
     """
     Returns all of the rows in the left DataFrame that have a match
-    in the right DataFrame.
+    in the right DataFrame. Rows keep the order of the left DataFrame,
+    even when keys repeat, and get a new default index.
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame): Right DataFrame, or its `JoinIndex` from
+            `prepare_join`. A right side too large to load at once can be given as a list of DataFrames or a
+            function returning an iterable of DataFrames, such as
+            `lambda: pd.read_csv(path, chunksize=10**6)`; it is then matched
+            through a Bloom filter (see `chunked_key_membership`).
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
             on that column. If a list of lists which contain strings or
             integers, the right/left columns to join on.
+        false_positive_rate (float): Bloom filter false positive rate for a
+            chunked right side.
+        memory_budget (int): maximum Bloom filter size in bytes for a
+            chunked right side.
+        expected_keys (int): number of keys of a chunked right side.
 
     Example:
         a >> semi_join(b, by='x1')
@@ -202,33 +1004,31 @@ def semi_join(df, other, **kwargs):
         1  B   2
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    if not right_on:
-        right_on = [col_name for col_name in df.columns.values.tolist() if col_name in other.columns.values.tolist()]
-        left_on = right_on
-    elif not isinstance(right_on, (list, tuple)):
-        right_on = [right_on]
-    other_reduced = other[right_on].drop_duplicates()
-    joined = df.merge(other_reduced, how='inner', left_on=left_on,
-                      right_on=right_on, suffixes=('', '_y'),
-                      indicator=True).query('_merge=="both"')[df.columns.values.tolist()]
-    return joined
+    matched = _membership(df, other, kwargs)
+    return df[matched].reset_index(drop=True)
 
 
 @pipe
 def anti_join(df, other, **kwargs):
     """
     Returns all of the rows in the left DataFrame that do not have a
-    match in the right DataFrame.
+    match in the right DataFrame. Rows keep the order of the left
+    DataFrame and are indexed by their position in it.
 
     Args:
         df (pandas.DataFrame): Left DataFrame (passed in via pipe)
-        other (pandas.DataFrame): Right DataFrame
+        other (pandas.DataFrame): Right DataFrame, its `JoinIndex` or a
+            chunked right side as for `semi_join`.
 
     Kwargs:
         by (str or list): Columns to join on. If a single string, will join
             on that column. If a list of lists which contain strings or
             integers, the right/left columns to join on.
+        false_positive_rate (float): Bloom filter false positive rate for a
+            chunked right side.
+        memory_budget (int): maximum Bloom filter size in bytes for a
+            chunked right side.
+        expected_keys (int): number of keys of a chunked right side.
 
     Example:
         a >> anti_join(b, by='x1')
@@ -237,19 +1037,291 @@ def anti_join(df, other, **kwargs):
         2  C   3
     """
 
-    left_on, right_on, suffixes = get_join_parameters(kwargs)
-    if not right_on:
-        right_on = [col_name for col_name in df.columns.values.tolist() if col_name in other.columns.values.tolist()]
-        left_on = right_on
-    elif not isinstance(right_on, (list, tuple)):
-        right_on = [right_on]
-    other_reduced = other[right_on].drop_duplicates()
-    joined = df.merge(other_reduced, how='left', left_on=left_on,
-                      right_on=right_on, suffixes=('', '_y'),
-                      indicator=True).query('_merge=="left_only"')[df.columns.values.tolist()]
+    unmatched = ~_membership(df, other, kwargs)
+    joined = df[unmatched]
+    # rows keep their position in the left DataFrame as their index
+    joined.index = np.flatnonzero(unmatched)
     return joined
 
 
+# ------------------------------------------------------------------------------
+# As-of and interval joins
+# ------------------------------------------------------------------------------
+
+def _pair_columns(on):
+    if isinstance(on, tuple):
+        return on
+    return on, on
+
+
+def _join_group_codes(df, other, by):
+    """
+    Returns the group number of the `by` keys of every left and right row,
+    equal for equal keys, and -1 for rows with missing keys.
+    """
+
+    if by is None:
+        return np.zeros(df.shape[0], dtype=np.int64), np.zeros(other.shape[0], dtype=np.int64)
+    left_by, right_by, suffixes = get_join_parameters({'by': by})
+    if not isinstance(left_by, list):
+        left_by, right_by = [left_by], [right_by]
+    right_keys = other[right_by].copy()
+    right_keys.columns = left_by
+    keys = pd.concat([df[left_by], right_keys], ignore_index=True)
+    codes = keys.groupby(left_by, sort=False).ngroup().fillna(-1).values.astype(np.int64)
+    return codes[:df.shape[0]], codes[df.shape[0]:]
+
+
+def _sortable(values):
+    # integers and datetimes stay int64, since float64 cannot tell large
+    # integers apart
+    if values.dtype.kind in 'mM':
+        return values.values.view(np.int64)
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'iu':
+        if values.dtype.kind == 'i' or len(values) == 0 or \
+                values.values.max() <= np.iinfo(np.int64).max:
+            return values.values.astype(np.int64)
+    return values.values.astype(np.float64)
+
+
+def _distance(a, b):
+    # exact distances between int64 values (as uint64, which holds any of
+    # them), and float distances otherwise
+    if a.dtype.kind == 'i' and b.dtype.kind == 'i':
+        return np.where(a >= b, a.view(np.uint64) - b.view(np.uint64),
+                        b.view(np.uint64) - a.view(np.uint64))
+    return np.abs(a.astype(np.float64) - b.astype(np.float64))
+
+
+def _ranked_keys(codes, *values):
+    """
+    Combines group numbers and values into int64 keys that sort by group
+    and then by value, so that a single `searchsorted` finds positions
+    within groups.
+    """
+
+    uniques, ranks = np.unique(np.concatenate(values), return_inverse=True)
+    keys, start = [], 0
+    for group_codes, group_values in zip(codes, values):
+        stop = start + len(group_values)
+        keys.append(group_codes * max(len(uniques), 1) + ranks[start:stop])
+        start = stop
+    return keys
+
+
+def _by_pairs(by):
+    if by is None:
+        return []
+    left_by, right_by, suffixes = get_join_parameters({'by': by})
+    if not isinstance(left_by, list):
+        left_by, right_by = [left_by], [right_by]
+    return list(zip(left_by, right_by))
+
+
+@pipe
+def asof_join(df, other, on=None, by=None, direction='backward',
+              allow_exact_matches=True, tolerance=None, suffixes=('_x', '_y')):
+    """
+    Joins each row of the left DataFrame to the right row with the nearest
+    `on` value, optionally among the right rows with the same `by` keys,
+    such as the latest quote for each trade. Left rows without a match get
+    missing values. Rows keep the order of the left DataFrame.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame (passed in via pipe)
+        other (pandas.DataFrame): Right DataFrame
+
+    Kwargs:
+        on (str or tuple): The ordered (numeric or datetime) column to match
+            on, or a tuple of the left and right column names.
+        by (str or list): Columns that must be equal, as for the other joins.
+        direction (str): `'backward'` matches the last right value at or
+            before the left value, `'forward'` the first one at or after
+            it, and `'nearest'` the closest one (the earlier one on ties).
+        allow_exact_matches (bool): whether equal values match.
+        tolerance: largest distance between matched values.
+        suffixes (list): String suffixes to append to column names in left
+            and right DataFrames.
+
+    Example:
+        trades >> asof_join(quotes, on='time', by='ticker')
+    """
+
+    if direction not in ('backward', 'forward', 'nearest'):
+        raise ValueError("direction must be 'backward', 'forward' or 'nearest'")
+    left_on, right_on = _pair_columns(on)
+    left_codes, right_codes = _join_group_codes(df, other, by)
+    left_values, right_values = _sortable(df[left_on]), _sortable(other[right_on])
+
+    left_valid = (left_codes >= 0) & df[left_on].notnull().values
+    right_valid = np.flatnonzero((right_codes >= 0) & other[right_on].notnull().values)
+    left_keys, right_keys = _ranked_keys(
+        [left_codes[left_valid], right_codes[right_valid]],
+        left_values[left_valid], right_values[right_valid])
+    order = np.argsort(right_keys, kind='mergesort')
+    right_keys, right_valid = right_keys[order], right_valid[order]
+
+    positions = np.flatnonzero(left_valid)
+    matches = []
+    if len(right_valid) == 0:
+        # nothing to match, every left row gets missing values
+        direction = None
+    if direction in ('backward', 'nearest'):
+        side = 'right' if allow_exact_matches else 'left'
+        matches.append(np.searchsorted(right_keys, left_keys, side=side) - 1)
+    if direction in ('forward', 'nearest'):
+        side = 'left' if allow_exact_matches else 'right'
+        matches.append(np.searchsorted(right_keys, left_keys, side=side))
+
+    best = np.full(len(positions), -1)
+    best_distance = None
+    for match in matches:
+        found = (match >= 0) & (match < len(right_keys))
+        match = np.where(found, match, 0)
+        rows = right_valid[match]
+        found &= right_codes[rows] == left_codes[positions]
+        distance = _distance(right_values[rows], left_values[positions])
+        if tolerance is not None:
+            if isinstance(tolerance, (pd.Timedelta, np.timedelta64)):
+                tolerance = pd.Timedelta(tolerance).value
+            found &= distance <= tolerance
+        if best_distance is None:
+            better, best_distance = found, distance
+        else:
+            better = found & ((best < 0) | (distance < best_distance))
+            best_distance = np.where(better, distance, best_distance)
+        best = np.where(better, rows, best)
+
+    right_rows = np.full(df.shape[0], -1)
+    right_rows[positions] = best
+    return _joined_frame(df, other, np.arange(df.shape[0]), right_rows,
+                         _by_pairs(by) + [(left_on, right_on)], suffixes)
+
+
+def _block_matches(level_keys, nranks, blocks, block_size, ranks, side):
+    # positions in the level arrays of the entries of each block ranked at or
+    # past `ranks` (the blocks are sorted by rank within themselves)
+    first = np.searchsorted(level_keys, blocks * nranks + ranks, side=side)
+    counts = (blocks + 1) * block_size - first
+    queries = np.repeat(np.arange(len(blocks)), counts)
+    offsets = np.arange(len(queries)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return queries, first[queries] + offsets
+
+
+def _containing_intervals(ends, values, lower, upper, side):
+    """
+    Returns the pairs of query and interval positions of the intervals that
+    end at (`side='left'`) or after (`side='right'`) each query value, among
+    the intervals at positions `lower` to `upper` of intervals sorted by
+    start.
+
+    The ranges of intervals are split into the aligned blocks of a segment
+    tree over the intervals sorted by start. Every block has its intervals
+    sorted by end, so that the intervals of a block that end after a value
+    are found with one `searchsorted`. A value is looked up in at most two
+    blocks per level, which takes O((n + m) log(m) ** 2) time and memory in
+    proportion to the number of matches, however long the intervals are.
+    """
+
+    nintervals = len(ends)
+    uniques, ranks = np.unique(np.concatenate([ends, values]), return_inverse=True)
+    end_ranks, value_ranks = ranks[:nintervals], ranks[nintervals:]
+    positions = np.arange(nintervals)
+
+    queries, intervals = [], []
+    lower, upper = lower.copy(), upper.copy()
+    level = 0
+    while (lower < upper).any():
+        # the intervals sorted by end within each block of 2 ** level
+        blocks = positions >> level
+        order = np.lexsort((end_ranks, blocks))
+        level_keys = blocks[order] * len(uniques) + end_ranks[order]
+
+        active = lower < upper
+        use_lower = active & (lower & 1 == 1)
+        use_upper = active & (upper & 1 == 1)
+        upper = np.where(use_upper, upper - 1, upper)
+        for use, block in ((use_lower, lower), (use_upper, upper)):
+            used = np.flatnonzero(use)
+            found, entries = _block_matches(level_keys, len(uniques), block[used],
+                                            1 << level, value_ranks[used], side)
+            queries.append(used[found])
+            intervals.append(order[entries])
+        lower = np.where(use_lower, lower + 1, lower) >> 1
+        upper = upper >> 1
+        level += 1
+
+    empty = np.zeros(0, dtype=np.int64)
+    return np.concatenate(queries + [empty]), np.concatenate(intervals + [empty])
+
+
+@pipe
+def interval_join(df, other, on=None, start=None, end=None, by=None,
+                  how='inner', closed='both', suffixes=('_x', '_y')):
+    """
+    Joins each row of the left DataFrame to the right rows whose interval
+    from `start` to `end` contains the left `on` value, optionally among the
+    right rows with the same `by` keys. Intervals may overlap, in which case
+    a left row is joined to each of them. Rows keep the order of the left
+    DataFrame, and the matches of a row the order of the right DataFrame.
+
+    Args:
+        df (pandas.DataFrame): Left DataFrame (passed in via pipe)
+        other (pandas.DataFrame): Right DataFrame
+
+    Kwargs:
+        on (str): The left (numeric or datetime) column to match.
+        start (str): The right column holding the start of the intervals.
+        end (str): The right column holding the end of the intervals.
+        by (str or list): Columns that must be equal, as for the other joins.
+        how (str): `'inner'` keeps matched rows only, `'left'` also keeps
+            left rows without a match, with missing values.
+        closed (str): which ends of the intervals are included: `'both'`,
+            `'left'`, `'right'` or `'neither'`.
+        suffixes (list): String suffixes to append to column names in left
+            and right DataFrames.
+
+    Example:
+        events >> interval_join(sessions, on='time', start='begin', end='finish', by='user')
+    """
+
+    if how not in ('inner', 'left'):
+        raise ValueError("how must be 'inner' or 'left'")
+    if closed not in ('both', 'left', 'right', 'neither'):
+        raise ValueError("closed must be 'both', 'left', 'right' or 'neither'")
+    left_codes, right_codes = _join_group_codes(df, other, by)
+    values = _sortable(df[on])
+    starts, ends = _sortable(other[start]), _sortable(other[end])
+
+    left_valid = np.flatnonzero((left_codes >= 0) & df[on].notnull().values)
+    right_valid = np.flatnonzero((right_codes >= 0) & other[start].notnull().values &
+                                 other[end].notnull().values & (ends >= starts))
+    left_rows = right_rows = np.zeros(0, dtype=np.int64)
+    if len(left_valid) and len(right_valid):
+        # the intervals of a value's group that start before it are a range
+        # of the intervals sorted by group and start
+        right_keys, left_keys = _ranked_keys(
+            [right_codes[right_valid], left_codes[left_valid]],
+            starts[right_valid], values[left_valid])
+        order = np.argsort(right_keys, kind='mergesort')
+        right_sorted = right_valid[order]
+        lower = np.searchsorted(right_codes[right_sorted], left_codes[left_valid], side='left')
+        upper = np.searchsorted(right_keys[order], left_keys,
+                                side='right' if closed in ('both', 'left') else 'left')
+        left, right = _containing_intervals(
+            ends[right_sorted], values[left_valid], lower, upper,
+            'left' if closed in ('both', 'right') else 'right')
+        left_rows, right_rows = left_valid[left], right_sorted[right]
+
+    if how == 'left':
+        unmatched = np.setdiff1d(np.arange(df.shape[0]), left_rows)
+        left_rows = np.concatenate([left_rows, unmatched])
+        right_rows = np.concatenate([right_rows, np.full(len(unmatched), -1)])
+    order = np.lexsort((right_rows, left_rows))
+    return _joined_frame(df, other, left_rows[order], right_rows[order],
+                         _by_pairs(by), suffixes)
+
+
 # ------------------------------------------------------------------------------
 # Binding
 # ------------------------------------------------------------------------------
@@ -0,0 +1,292 @@
+from .base import *
+from .group import group_by, ungroup
+from .reshape import arrange, rename
+from .select import select, drop
+from .subset import head, tail, sample, distinct, row_slice, mask
+from .summarize import summarize
+from .transform import mutate, transmute
+from .vector import desc
+
+
+# ------------------------------------------------------------------------------
+# Lazy evaluation of pipe chains
+# ------------------------------------------------------------------------------
+
+def _verb_name(verb):
+    function = verb.function
+    while hasattr(function, 'function'):
+        function = function.function
+    return getattr(function, '__name__', 'pipe')
+
+
+def _static_label(arg):
+    if isinstance(arg, str):
+        return arg
+    if isinstance(arg, Intention) and not arg.inverted:
+        return intention_label(arg)
+    return None
+
+
+def _static_labels(args):
+    labels = [_static_label(a) for a in flatten(args)]
+    if any([label is None for label in labels]):
+        return None
+    return labels
+
+
+def _union(*column_sets):
+    if any([c is None for c in column_sets]):
+        return None
+    return set().union(*column_sets)
+
+
+def _sort_key_columns(args):
+    columns = set()
+    for arg in flatten(args):
+        if isinstance(arg, str):
+            arg_columns = set([arg])
+        elif isinstance(arg, Intention):
+            arg_columns = intention_columns(arg)
+        else:
+            arg_columns = None
+        columns = _union(columns, arg_columns)
+    return columns
+
+
+def _is_order_independent_key(arg):
+    if isinstance(arg, Intention) and arg.expression is not None:
+        expression = arg.expression
+        if expression[0] == 'function' and expression[1] is desc:
+            return all([_is_order_independent_key(a) for a in expression[2]])
+    return isinstance(arg, str) or is_elementwise(arg)
+
+
+def _input_columns(node, required):
+    """
+    Returns the columns a plan node needs from its input to produce the
+    `required` columns of its output (`None` meaning all of them).
+    """
+
+    verb, args, kwargs = node.verb, node.args, node.kwargs
+
+    if verb is select:
+        labels = _static_labels(args)
+        return None if labels is None else set(labels)
+    if verb is transmute:
+        labels = _static_labels(args)
+        return None if labels is None else _union(
+            set(labels), intention_columns(list(kwargs.values())))
+    if verb is summarize:
+        return intention_columns(list(kwargs.values()))
+
+    if required is None:
+        return None
+
+    if verb is mutate:
+        kept = [v for k, v in kwargs.items() if k in required]
+        return _union(required - set(kwargs.keys()), intention_columns(kept))
+    if verb is mask:
+        return _union(required, intention_columns(list(args)))
+    if verb is arrange:
+        return _union(required, _sort_key_columns(args))
+    if verb is drop:
+        labels = _static_labels(args)
+        return None if labels is None else required | set(labels)
+    if verb is rename:
+        labels = _static_labels(list(kwargs.values()))
+        if labels is None:
+            return None
+        renamed = dict(zip(kwargs.keys(), labels))
+        return set([renamed.get(c, c) for c in required])
+    if verb in (head, tail, ungroup):
+        return required
+    if verb is row_slice:
+        return _union(required, intention_columns(list(args)))
+    if verb is sample:
+        weights = kwargs.get('weights', None)
+        if isinstance(weights, str):
+            return required | set([weights])
+        return _union(required, intention_columns(list(args) + list(kwargs.values())))
+    if verb in (distinct, group_by):
+        labels = _static_labels(args)
+        if labels is None or (verb is distinct and len(labels) == 0):
+            return None
+        return required | set(labels)
+    return None
+
+
+_plan_verbs = [select, drop, transmute, summarize, mutate, mask, arrange,
+               rename, head, tail, ungroup, row_slice, sample, distinct,
+               group_by]
+
+
+_stable_sort_kinds = ('mergesort', 'stable')
+
+
+def _can_swap_mask(previous, mask_node):
+    """
+    Returns True if a mask can be moved ahead of the node before it without
+    changing the result.
+    """
+
+    if mask_node.kwargs or not all([isinstance(a, Intention) for a in mask_node.args]):
+        return False
+    mask_columns = intention_columns(list(mask_node.args))
+    if mask_columns is None:
+        return False
+
+    if previous.verb is mutate:
+        return (not (mask_columns & set(previous.kwargs.keys())) and
+                not previous.args and
+                all([is_elementwise(v) for v in previous.kwargs.values()]))
+    if previous.verb is arrange:
+        # only a stable sort keeps tied rows in the same order whether or not
+        # rows were removed first
+        return (previous.kwargs.get('kind') in _stable_sort_kinds and
+                all([is_elementwise(a) for a in mask_node.args]) and
+                all([_is_order_independent_key(a) for a in flatten(previous.args)]))
+    return False
+
+
+class LazyFrame(object):
+    """
+    A DataFrame together with a plan of pipe stages that have not been run
+    yet. Piping a `LazyFrame` into verbs with `>>` adds stages to the plan,
+    and the plan is only optimized and run when `collect()` is called.
+
+    The optimizer moves `mask` (`filter_by`) stages ahead of `mutate` and
+    `arrange` stages where that does not change the result, removes `mutate`
+    assignments that no later stage uses, and drops source columns that are
+    not needed by the time a `select`, `transmute` or `summarize` stage
+    narrows the columns. Masks are only moved past an `arrange` with a
+    stable sort `kind` (`'mergesort'` or `'stable'`), since other sorts can
+    order tied rows differently once rows are removed.
+
+    Args:
+        source (pandas.DataFrame): the DataFrame the plan starts from.
+        stages (list): the `pipe` stages to apply, in order.
+    """
+
+    def __init__(self, source, stages=None):
+        self.source = source
+        self.stages = list(stages) if stages is not None else []
+
+    def __rshift__(self, other):
+        if not isinstance(other, pipe):
+            return NotImplemented
+        return LazyFrame(self.source, self.stages + other.stages())
+
+    def _grouping(self):
+        """
+        Returns the grouping columns in effect at the input of each stage,
+        or `None` if a grouping cannot be determined statically.
+        """
+
+        grouped_by = getattr(self.source, '_grouped_by', None)
+        groupings = []
+        for stage in self.stages:
+            groupings.append(grouped_by)
+            if stage.verb is group_by:
+                grouped_by = _static_labels(stage.args)
+                if grouped_by is None:
+                    return None
+            elif stage.verb is ungroup:
+                grouped_by = None
+            elif stage.verb not in _plan_verbs:
+                return None
+        return groupings
+
+    def _pushdown_masks(self, stages):
+        stages = list(stages)
+        moved = True
+        while moved:
+            moved = False
+            for i in range(1, len(stages)):
+                if stages[i].verb is mask and _can_swap_mask(stages[i - 1], stages[i]):
+                    stages[i - 1], stages[i] = stages[i], stages[i - 1]
+                    moved = True
+        return stages
+
+    def _prune_columns(self, stages):
+        plan = LazyFrame(self.source, stages)
+        groupings = plan._grouping()
+        if groupings is None:
+            return None, stages
+
+        required = None
+        pruned = []
+        for stage, grouped_by in reversed(list(zip(stages, groupings))):
+            if stage.verb is mutate and required is not None:
+                kept = {k: v for k, v in stage.kwargs.items() if k in required}
+                if not kept:
+                    continue
+                if len(kept) < len(stage.kwargs):
+                    stage = mutate(**kept)
+            required = _input_columns(stage, required)
+            if required is not None and grouped_by:
+                required = required | set(grouped_by)
+            pruned.append(stage)
+        return required, list(reversed(pruned))
+
+    def optimize(self):
+        """
+        Returns an equivalent `LazyFrame` with an optimized plan.
+        """
+
+        stages = self._pushdown_masks(self.stages)
+        required, stages = self._prune_columns(stages)
+
+        source = self.source
+        if required is not None:
+            columns = [c for c in source.columns if c in required]
+            if len(columns) < source.shape[1]:
+                grouped_by = getattr(source, '_grouped_by', None)
+                source = source[columns]
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    source._grouped_by = grouped_by
+        return LazyFrame(source, stages)
+
+    def explain(self, optimize=True):
+        """
+        Returns a description of the plan, one stage per line. The first
+        line lists the source columns that are read.
+
+        Kwargs:
+            optimize (bool): whether to describe the optimized plan.
+        """
+
+        plan = self.optimize() if optimize else self
+        lines = ['source: ' + ', '.join([str(c) for c in plan.source.columns])]
+        lines += [_verb_name(s.verb) if s.verb is not None else 'pipe'
+                  for s in plan.stages]
+        return '\n'.join(lines)
+
+    def collect(self, optimize=True):
+        """
+        Runs the plan and returns the resulting DataFrame.
+
+        Kwargs:
+            optimize (bool): whether to optimize the plan before running it.
+        """
+
+        plan = self.optimize() if optimize else self
+        df = plan.source
+        for stage in plan.stages:
+            df = stage.apply_stage(df)
+        return df
+
+
+def lazy(df):
+    """
+    Starts a lazily evaluated pipe chain from a DataFrame.
+
+    Args:
+        df (pandas.DataFrame): the DataFrame to start the plan from.
+
+    Example:
+        plan = lazy(diamonds) >> mutate(ratio=X.x / X.y) >> mask(X.cut == 'Ideal') >> select(X.ratio)
+        plan.collect()
+    """
+
+    return LazyFrame(df)
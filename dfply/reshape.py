@@ -1,6 +1,11 @@
 from .base import *
 import re
 
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
 
 # ------------------------------------------------------------------------------
 # Sorting
@@ -55,7 +60,8 @@ def rename(df, **kwargs):
             values are current names of columns.
     """
 
-    return df.rename(columns={v: k for k, v in kwargs.items()})
+    # The pipe has already handed this verb its own copy of the frame.
+    return df.rename(columns={v: k for k, v in kwargs.items()}, copy=False)
 
 
 # ------------------------------------------------------------------------------
@@ -69,7 +75,9 @@ def gather(df, key, values, *args, **kwargs):
     Melts the specified columns in your DataFrame into two key:value columns.
 
     Args:
-        key (str): Name of identifier column.
+        key (str or list): Name of identifier column. A list of names when
+            the column names are split with `names_sep` or `names_pattern`,
+            one for each part of the names.
         values (str): Name of column that will contain values for the key.
         *args (str, int, symbolic): Columns to "melt" into the new key and
             value columns. If no args are specified, all columns are melted
@@ -79,6 +87,20 @@ def gather(df, key, values, *args, **kwargs):
         add_id (bool): Boolean value indicating whether to add a `"_ID"`
             column that will preserve information about the original rows
             (useful for being able to re-widen the data later).
+        categorical (bool): Boolean indicating whether the key columns are
+            categorical, with the melted column names as categories, rather
+            than object columns holding a name for every row. Defaults to
+            `True`.
+        names_sep (str): Regex string used to split the melted column names
+            into the parts named by `key`.
+        names_pattern (str): Regex string whose groups match the parts
+            named by `key` in the melted column names.
+
+    When one of the names in `key` is `".value"`, that part of the column
+    names names the value columns instead, so that several groups of
+    columns are melted at once into one value column per group (and
+    `values` is not used). Cells of column names that do not exist are
+    filled with missing values.
 
     Example:
         diamonds >> gather('variable', 'value', ['price', 'depth','x','y','z']) >> head(5)
@@ -89,6 +111,15 @@ def gather(df, key, values, *args, **kwargs):
         2   0.23     Good     E     VS1   65.0    price  327.0
         3   0.29  Premium     I     VS2   58.0    price  334.0
         4   0.31     Good     J     SI2   58.0    price  335.0
+
+        sales >> gather(['.value', 'year'], None, 'sales_2019', 'sales_2020',
+                        'visits_2019', names_sep='_')
+
+          store  year  sales  visits
+        0     a  2019      3     7.0
+        1     b  2019      4     8.0
+        2     a  2020      5     NaN
+        3     b  2020      6     NaN
     """
 
     if len(args) == 0:
@@ -101,7 +132,78 @@ def gather(df, key, values, *args, **kwargs):
 
     columns = df.columns.tolist()
     id_vars = [col for col in columns if col not in args]
-    return pd.melt(df, id_vars, list(args), key, values)
+
+    key = [key] if isinstance(key, str) else list(key)
+    names = _split_names(args, len(key), kwargs.get('names_sep'),
+                         kwargs.get('names_pattern'))
+
+    # the part of the names naming the value columns, and the parts making
+    # up the keys of each block of rows
+    if '.value' in key:
+        value_part = key.index('.value')
+        key = key[:value_part] + key[value_part + 1:]
+        value_names = [name[value_part] for name in names]
+        names = [name[:value_part] + name[value_part + 1:] for name in names]
+    else:
+        value_names = [values] * len(names)
+
+    # one block of rows for each distinct key, in the order of the columns
+    block_of_name, blocks = pd.factorize(pd.Index(names, tupleize_cols=False))
+    key_codes, key_categories = [], []
+    for i in range(len(key)):
+        codes, categories = pd.factorize(pd.Index([block[i] for block in blocks]))
+        key_codes.append(codes)
+        key_categories.append(categories)
+
+    nrows, nblocks = df.shape[0], len(blocks)
+    out_df = df[id_vars].take(np.tile(np.arange(nrows), nblocks)).reset_index(drop=True)
+
+    categorical = kwargs.get('categorical', True)
+    for i, name in enumerate(key):
+        codes = np.repeat(key_codes[i], nrows)
+        if categorical:
+            out_df[name] = pd.Categorical.from_codes(codes, key_categories[i])
+        else:
+            out_df[name] = key_categories[i].take(codes)
+
+    for value_name in pd.unique(pd.Series(value_names, dtype=object)):
+        column_of_block = {block_of_name[j]: args[j]
+                           for j in range(len(names)) if value_names[j] == value_name}
+        value_columns = [column_of_block.get(b) for b in range(nblocks)]
+        if None not in value_columns:
+            stacked = df[value_columns]
+            if all(isinstance(dtype, np.dtype) for dtype in stacked.dtypes):
+                # stacked in one copy, like `melt` does
+                out_df[value_name] = stacked.to_numpy().ravel('F')
+                continue
+        empty = df[next(iter(column_of_block.values()))].iloc[:0].reindex(np.arange(nrows))
+        parts = [empty if c is None else df[c] for c in value_columns]
+        out_df[value_name] = pd.concat(parts, ignore_index=True).values
+
+    return out_df
+
+
+def _split_names(columns, nparts, names_sep, names_pattern):
+    """
+    Splits the column names into the parts of the gathered key columns.
+    """
+
+    if names_sep is None and names_pattern is None:
+        if nparts != 1:
+            raise ValueError('A key per part of the names needs names_sep or names_pattern')
+        return [(column,) for column in columns]
+
+    names = []
+    for column in columns:
+        if names_sep is not None:
+            parts = re.split(names_sep, str(column))
+        else:
+            match = re.match(names_pattern, str(column))
+            parts = match.groups() if match else ()
+        if len(parts) != nparts:
+            raise ValueError('Column name {!r} does not split into {} parts'.format(column, nparts))
+        names.append(tuple(parts))
+    return names
 
 
 # ------------------------------------------------------------------------------
@@ -116,31 +218,47 @@ def convert_type(df, columns):
     # taken in part from the dplython package
     out_df = df.copy()
     for col in columns:
-        column_values = pd.Series(out_df[col].unique())
-        column_values = column_values[~column_values.isnull()]
-        # empty
-        if len(column_values) == 0:
-            continue
-        # boolean
-        if set(column_values.values) < {'True', 'False'}:
-            out_df[col] = out_df[col].map({'True': True, 'False': False})
-            continue
-        # numeric
-        if pd.to_numeric(column_values, errors='coerce').isnull().sum() == 0:
-            out_df[col] = pd.to_numeric(out_df[col], errors='ignore')
-            continue
-        # datetime
-        if pd.to_datetime(column_values, errors='coerce').isnull().sum() == 0:
-            out_df[col] = pd.to_datetime(out_df[col], errors='ignore',
-                                         infer_datetime_format=True)
-            continue
+        if isinstance(out_df[col].dtype, pd.SparseDtype):
+            out_df[col] = _convert_sparse_column(out_df[col])
+        else:
+            out_df[col] = _convert_column(out_df[col])
 
     return out_df
 
 
+def _convert_column(column):
+    column_values = pd.Series(column.unique())
+    column_values = column_values[~column_values.isnull()]
+    # empty
+    if len(column_values) == 0:
+        return column
+    # boolean
+    if set(column_values.values) < {'True', 'False'}:
+        return column.map({'True': True, 'False': False})
+    # numeric
+    if pd.to_numeric(column_values, errors='coerce').isnull().sum() == 0:
+        return pd.to_numeric(column, errors='ignore')
+    # datetime
+    if pd.to_datetime(column_values, errors='coerce').isnull().sum() == 0:
+        return pd.to_datetime(column, errors='ignore', infer_datetime_format=True)
+    return column
+
+
+def _convert_sparse_column(column):
+    # only the values held by a sparse column are converted
+    values = _convert_column(pd.Series(column.sparse.sp_values)).values
+    values = values.astype({'i': np.float64, 'u': np.float64, 'b': object}.get(
+        values.dtype.kind, values.dtype))
+    fill_value = {'M': np.datetime64('NaT'), 'm': np.timedelta64('NaT')}.get(
+        values.dtype.kind, np.nan)
+    return pd.Series(pd.arrays.SparseArray(values, sparse_index=column.array.sp_index,
+                                           dtype=pd.SparseDtype(values.dtype, fill_value)),
+                     index=column.index, name=column.name)
+
+
 @pipe
 @symbolic_evaluation(eval_as_label=['*'])
-def spread(df, key, values, convert=False):
+def spread(df, key, values, convert=False, sparse=False):
     """
     Transforms a "long" DataFrame into a "wide" format using a key and value
     column.
@@ -157,6 +275,10 @@ def spread(df, key, values, convert=False):
     Kwargs:
         convert (bool): Boolean indicating whether or not to try and convert
             the spread columns to more appropriate data types.
+        sparse (bool): Boolean indicating whether to return the spread
+            columns as sparse columns (`pandas.SparseDtype`) that only hold
+            the values present in the long DataFrame, for keys with many
+            distinct values of which each id only has a few.
 
 
     Example:
@@ -171,34 +293,123 @@ def spread(df, key, values, convert=False):
         4  1000  0.75     SI1     D      Ideal  62.3  2898    55  5.83   5.8  3.62
     """
 
-    # Taken mostly from dplython package
     columns = df.columns.tolist()
     id_cols = [col for col in columns if not col in [key, values]]
 
-    temp_index = ['' for i in range(len(df))]
-    for id_col in id_cols:
-        temp_index += df[id_col].map(str)
-
-    out_df = df.assign(temp_index=temp_index)
-    out_df = out_df.set_index('temp_index')
-    spread_data = out_df[[key, values]]
-
-    if not all(spread_data.groupby([spread_data.index, key]).agg(
-            'count').reset_index()[values] < 2):
-        raise ValueError('Duplicate identifiers')
+    # one row per distinct combination of the id columns, in sorted order
+    if id_cols:
+        rows = df.groupby(id_cols, sort=True, dropna=False).ngroup().values
+    else:
+        rows = np.zeros(df.shape[0], dtype=np.int64)
+    nrows = rows.max() + 1 if len(rows) else 0
 
-    spread_data = spread_data.pivot(columns=key, values=values)
+    # one column per distinct key, in sorted order with a missing key first
+    keys, labels = pd.factorize(df[key], sort=True)
+    if (keys < 0).any():
+        keys = keys + 1
+        labels = pd.Index([np.nan]).append(pd.Index(labels))
 
-    if convert and (out_df[values].dtype.kind in 'OSaU'):
+    if sparse:
+        spread_data = _scatter_sparse(df[values], rows, keys, nrows, len(labels))
+    else:
+        cells = rows * len(labels) + keys
+        if len(cells) and np.bincount(cells).max() > 1:
+            raise ValueError('Duplicate identifiers')
+        spread_data = _scatter(df[values], cells, nrows, len(labels))
+    spread_data.columns = labels
+    if convert and (df[values].dtype.kind in 'OSaU'):
         columns_to_convert = [col for col in spread_data if col not in columns]
         spread_data = convert_type(spread_data, columns_to_convert)
 
-    out_df = out_df[id_cols].drop_duplicates()
-    out_df = out_df.merge(spread_data, left_index=True, right_index=True).reset_index(drop=True)
+    # the first row of each id, in the sorted order of the ids
+    first = np.unique(rows, return_index=True)[1]
+    out_df = df[id_cols].take(first).reset_index(drop=True)
 
-    out_df = (out_df >> arrange(id_cols)).reset_index(drop=True)
+    # id columns named like a key are suffixed as when the parts are merged
+    overlap = set(id_cols) & set(spread_data.columns)
+    out_df.columns = ['{}_x'.format(c) if c in overlap else c for c in out_df.columns]
+    spread_data.columns = ['{}_y'.format(c) if c in overlap else c for c in spread_data.columns]
+    return pd.concat([out_df, spread_data], axis=1)
 
-    return out_df
+
+def _scatter(values, cells, nrows, ncols):
+    """
+    Places the values at their cell (row * ncols + column) of a wide
+    DataFrame, filling empty cells with NaN and upcasting the values like
+    `pivot` does.
+    """
+
+    dtype = values.dtype
+    full = len(cells) == nrows * ncols
+    if not isinstance(dtype, np.dtype):
+        # extension dtypes are left to unstack, on an integer index
+        index = pd.MultiIndex(levels=[np.arange(nrows), np.arange(ncols)],
+                              codes=[cells // ncols, cells % ncols])
+        wide = pd.Series(values.values, index=index).unstack()
+        return wide.reindex(index=np.arange(nrows), columns=np.arange(ncols))
+    if not full:
+        dtype = np.dtype({'i': np.float64, 'u': np.float64, 'b': object}.get(dtype.kind, dtype))
+    wide = np.empty(nrows * ncols, dtype=dtype)
+    if not full:
+        wide.fill({'M': np.datetime64('NaT'), 'm': np.timedelta64('NaT')}.get(dtype.kind, np.nan))
+    wide[cells] = values.values
+    return pd.DataFrame(wide.reshape(nrows, ncols))
+
+
+def _scatter_sparse(values, rows, keys, nrows, ncols):
+    """
+    Builds the wide DataFrame of `_scatter` with a sparse column for every
+    key, holding only the values of the rows that have the key, without
+    creating the dense array.
+    """
+
+    order = np.lexsort((rows, keys))
+    rows, keys = rows[order], keys[order]
+    if ((rows[1:] == rows[:-1]) & (keys[1:] == keys[:-1])).any():
+        raise ValueError('Duplicate identifiers')
+
+    values = values.values[order]
+    if not isinstance(values.dtype, np.dtype):
+        values = np.asarray(values, dtype=object)
+    dtype = np.dtype({'i': np.float64, 'u': np.float64, 'b': object}.get(values.dtype.kind,
+                                                                       values.dtype))
+    fill_value = {'M': np.datetime64('NaT'), 'm': np.timedelta64('NaT')}.get(dtype.kind, np.nan)
+    values = values.astype(dtype)
+
+    sparse_dtype = pd.SparseDtype(dtype, fill_value)
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=ncols))])
+    columns = {}
+    for j, (start, stop, sparse_index) in enumerate(
+            zip(bounds[:-1], bounds[1:], _sparse_indexes(rows, bounds, nrows))):
+        columns[j] = pd.arrays.SparseArray(values[start:stop], sparse_index=sparse_index,
+                                           dtype=sparse_dtype)
+    return pd.DataFrame(columns, index=pd.RangeIndex(nrows))
+
+
+def _sparse_indexes(rows, bounds, nrows):
+    """
+    Yields the sparse index of each column of `_scatter_sparse`, whose rows
+    are `rows[bounds[j]:bounds[j + 1]]`.
+    """
+
+    if scipy is not None:
+        # the columns of a compressed sparse column matrix of the cells
+        # have their indexes built from the rows directly, in time
+        # proportional to the number of values
+        marks = scipy.sparse.csc_matrix(
+            (np.ones(len(rows)), rows, bounds), shape=(nrows, len(bounds) - 1))
+        for _, column in pd.DataFrame.sparse.from_spmatrix(marks).items():
+            yield column.array.sp_index
+        return
+
+    # otherwise the rows of every column are marked in one dense float
+    # buffer, whose sparse index then holds the values of the column (so
+    # only a single column is ever dense, and never as objects)
+    marks = np.zeros(nrows)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        marks[rows[start:stop]] = 1
+        yield pd.arrays.SparseArray(marks, fill_value=0.0).sp_index
+        marks[rows[start:stop]] = 0
 
 
 # ------------------------------------------------------------------------------
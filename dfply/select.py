@@ -47,6 +47,7 @@ def resolve_selection(df, *args, drop=False):
 
 
 @pipe
+@group_invariant
 @group_delegation
 @symbolic_evaluation(eval_as_selector=True)
 def select(df, *args):
@@ -64,6 +65,7 @@ def select(df, *args):
 
 
 @pipe
+@group_invariant
 @group_delegation
 @symbolic_evaluation(eval_as_selector=True)
 def drop(df, *args):
@@ -3,16 +3,75 @@ import warnings
 import numpy as np
 
 
+# ------------------------------------------------------------------------------
+# Grouped row selection
+# ------------------------------------------------------------------------------
+
+def _take_groups(df, group_index, positions):
+    """
+    Returns the rows of a grouped DataFrame at `positions`, which lists the
+    selected rows group after group, in the order `groupby.apply` returns
+    them: unchanged when every group kept all of its rows in their original
+    order, and group after group otherwise. Returns `None` when no rows are
+    selected.
+    """
+
+    if len(positions) == 0:
+        return None
+    if len(positions) == df.shape[0] and np.array_equal(positions, group_index.sorter):
+        return df
+    taken = df.take(positions)
+    set_group_index(taken, group_index.take(positions, taken))
+    return taken
+
+
+def _take_group_mask(df, group_index, keep):
+    positions = np.flatnonzero(keep)
+    positions = positions[np.argsort(group_index.codes[positions], kind='mergesort')]
+    return _take_groups(df, group_index, positions)
+
+
+def _is_int(value):
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
 # ------------------------------------------------------------------------------
 # `head` and `tail`
 # ------------------------------------------------------------------------------
 
-@dfpipe
+def _grouped_head(df, n=5):
+    group_index = get_group_index(df)
+    if group_index is None or not _is_int(n):
+        return None
+    positions = group_index.positions
+    if n < 0:
+        n = group_index.sizes[group_index.codes] + n
+    return _take_group_mask(df, group_index, positions < n)
+
+
+def _grouped_tail(df, n=5):
+    group_index = get_group_index(df)
+    if group_index is None or not _is_int(n):
+        return None
+    positions = group_index.positions
+    if n < 0:
+        return _take_group_mask(df, group_index, positions >= -n)
+    remaining = group_index.sizes[group_index.codes] - positions
+    return _take_group_mask(df, group_index, remaining <= n)
+
+
+@pipe
+@grouped_kernel(_grouped_head)
+@group_delegation
+@symbolic_evaluation
 def head(df, n=5):
     return df.head(n)
 
 
-@dfpipe
+@pipe
+@grouped_kernel(_grouped_tail)
+@group_delegation
+@symbolic_evaluation
 def tail(df, n=5):
     return df.tail(n)
 
@@ -22,12 +81,73 @@ def tail(df, n=5):
 # ------------------------------------------------------------------------------
 
 
-@dfpipe
+def _sample_arguments(n=None, frac=None, replace=False, weights=None,
+                      random_state=None, axis=None, ignore_index=False):
+    return n, frac, replace, weights, random_state, axis, ignore_index
+
+
+def _grouped_sample(df, *args, **kwargs):
+    # seeded samples are drawn one group at a time to keep them reproducible
+    try:
+        n, frac, replace, weights, random_state, axis, ignore_index = \
+            _sample_arguments(*args, **kwargs)
+    except TypeError:
+        return None
+    if (replace or weights is not None or random_state is not None or
+            axis not in (None, 0, 'index') or ignore_index):
+        return None
+    group_index = get_group_index(df)
+    if group_index is None:
+        return None
+
+    sizes = group_index.sizes
+    if n is None and frac is None:
+        n = 1
+    if n is not None and frac is None and _is_int(n):
+        counts = np.full(len(sizes), n)
+    elif n is None and isinstance(frac, (float, int, np.number)) and not isinstance(frac, bool):
+        counts = np.round(frac * sizes)
+    else:
+        return None
+    if (counts < 0).any() or (counts > sizes).any():
+        return None
+
+    # shuffle the rows of every group and take as many as needed from each
+    order = np.lexsort((np.random.random_sample(df.shape[0]), group_index.codes))
+    codes = group_index.codes[order]
+    positions = np.arange(len(order)) - group_index.boundaries[codes]
+    return _take_groups(df, group_index, order[positions < counts[codes]])
+
+
+@pipe
+@grouped_kernel(_grouped_sample)
+@group_delegation
+@symbolic_evaluation
 def sample(df, *args, **kwargs):
     return df.sample(*args, **kwargs)
 
 
+def _grouped_distinct(df, *args, **kwargs):
+    if set(kwargs.keys()) - set(['keep']):
+        return None
+    labels = [intention_label(a) if isinstance(a, Intention) and not a.inverted else a
+              for a in args]
+    if not all([isinstance(label, str) for label in labels]):
+        return None
+    group_index = get_group_index(df)
+    if group_index is None or not all([label in df.columns for label in labels]):
+        return None
+
+    subset = None
+    if labels:
+        subset = list(group_index.columns) + [l for l in labels
+                                              if l not in group_index.columns]
+    duplicated = df.duplicated(subset, **kwargs)
+    return _take_group_mask(df, group_index, ~duplicated.values)
+
+
 @pipe
+@grouped_kernel(_grouped_distinct)
 @group_delegation
 @symbolic_evaluation(eval_as_label=['*'])
 def distinct(df, *args, **kwargs):
@@ -36,7 +156,33 @@ def distinct(df, *args, **kwargs):
     return df.drop_duplicates(list(args), **kwargs)
 
 
-@dfpipe
+def _grouped_row_slice(df, indices):
+    if _is_int(indices):
+        indices = [indices]
+    if isinstance(indices, (tuple, list)):
+        indices = np.array(indices)
+    if (not isinstance(indices, np.ndarray) or indices.ndim != 1 or
+            indices.dtype.kind not in 'iu'):
+        return None
+    group_index = get_group_index(df)
+    if group_index is None:
+        return None
+
+    # position of every index in every group, group after group
+    sizes = group_index.sizes
+    slices = np.tile(indices.astype(np.int64), len(sizes))
+    group_sizes = np.repeat(sizes, len(indices))
+    if ((slices >= group_sizes) | (slices < -group_sizes)).any():
+        return None
+    slices = np.where(slices < 0, slices + group_sizes, slices)
+    slices += np.repeat(group_index.boundaries[:-1], len(indices))
+    return _take_groups(df, group_index, group_index.sorter[slices])
+
+
+@pipe
+@grouped_kernel(_grouped_row_slice)
+@group_delegation
+@symbolic_evaluation
 def row_slice(df, indices):
     if isinstance(indices, (tuple, list)):
         indices = np.array(indices)
@@ -55,7 +201,28 @@ def row_slice(df, indices):
 # Filtering/masking
 # ------------------------------------------------------------------------------
 
-@dfpipe
+def _grouped_mask(df, *args):
+    if not args or not all([isinstance(a, Intention) and is_group_vectorizable(a)
+                            for a in args]):
+        return None
+    group_index = get_group_index(df)
+    if group_index is None:
+        return None
+
+    cache = {}
+    keep = np.ones(df.shape[0], dtype=bool)
+    for arg in args:
+        value = evaluate_grouped(arg, df, group_index.codes, cache)
+        if not isinstance(value, pd.Series) or value.dtype != bool:
+            return None
+        keep &= ~value.values if arg.inverted else value.values
+    return _take_group_mask(df, group_index, keep)
+
+
+@pipe
+@grouped_kernel(_grouped_mask)
+@group_delegation
+@symbolic_evaluation(compile_expressions=True, share_subexpressions=True)
 def mask(df, *args):
     mask = pd.Series(np.ones(df.shape[0], dtype=bool))
     for arg in args:
@@ -68,7 +235,40 @@ def mask(df, *args):
 filter_by = mask   # alias for mask()
 
 
-@dfpipe
+def _grouped_top_n(df, n=None, ascending=True, col=None):
+    if not n or not _is_int(n) or not df.index.is_unique:
+        return None
+    if isinstance(col, Intention):
+        col = col.evaluate(df)
+    if not isinstance(col, pd.Series):
+        col = df.columns[-1]
+    else:
+        col = col._name
+    if list(df.columns).count(col) != 1:
+        return None
+    group_index = get_group_index(df)
+    if group_index is None:
+        return None
+
+    # keep the rows ranked at least as high as the nth highest rank of their
+    # group, like `top_n` does for each group
+    codes = group_index.codes
+    ranks = df[col].groupby(codes).rank(ascending=ascending).values
+    ranked = ~np.isnan(ranks)
+    order = np.lexsort((-ranks[ranked], codes[ranked]))
+    ranked_codes = codes[ranked][order]
+    counts = np.bincount(ranked_codes, minlength=group_index.ngroups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    nth = starts + np.minimum(counts, n) - 1
+    thresholds = np.full(group_index.ngroups, np.inf)
+    thresholds[counts > 0] = ranks[ranked][order][nth[counts > 0]]
+    return _take_group_mask(df, group_index, ranks >= thresholds[codes])
+
+
+@pipe
+@grouped_kernel(_grouped_top_n)
+@group_delegation
+@symbolic_evaluation
 def top_n(df, n=None, ascending=True, col=None):
     if not n:
         raise ValueError('n must be specified')
@@ -1,7 +1,41 @@
 from .base import *
 
 
-@dfpipe
+# ------------------------------------------------------------------------------
+# Grouped summary kernel
+# ------------------------------------------------------------------------------
+
+def _grouped_summarize(df, **kwargs):
+    if not kwargs or not all([is_group_summary(v) for v in kwargs.values()]):
+        return None
+    group_index = get_group_index(df)
+    if group_index is None:
+        return None
+
+    cache = {}
+    summarized = pd.DataFrame({name: evaluate_group_summary(value, df, group_index.codes, cache)
+                               for name, value in kwargs.items()},
+                              index=np.arange(group_index.ngroups),
+                              columns=list(kwargs.keys()))
+
+    # index the result like groupby.apply does, by the group keys and the
+    # index of each group's one-row summary
+    keys = group_index.keys
+    levels = [keys.get_level_values(i) for i in range(keys.nlevels)]
+    summarized.index = pd.MultiIndex.from_arrays(
+        levels + [np.zeros(len(keys), dtype=int)],
+        names=list(keys.names) + [None])
+    return reset_group_index(df, summarized)
+
+
+# ------------------------------------------------------------------------------
+# Summarization verbs
+# ------------------------------------------------------------------------------
+
+@pipe
+@grouped_kernel(_grouped_summarize)
+@group_delegation
+@symbolic_evaluation(share_subexpressions=True)
 def summarize(df, **kwargs):
     return pd.DataFrame({k: [v] for k, v in kwargs.items()})
 
@@ -1,4 +1,5 @@
 from .base import *
+from .base import _recursive_apply
 from .vector import *
 
 
@@ -6,7 +7,23 @@ from .vector import *
 # Series summary functions
 # ------------------------------------------------------------------------------
 
+def _is_numeric(series):
+    # also true for extension (nullable and sparse) numeric dtypes
+    return (pd.api.types.is_numeric_dtype(series.dtype) and
+            not pd.api.types.is_bool_dtype(series.dtype))
 
+
+def _present_values(series):
+    # the values of a sparse column filled with missing values are the ones
+    # it stores, which are summarized without densifying the column
+    if isinstance(series.dtype, pd.SparseDtype):
+        if pd.isnull(series.dtype.fill_value):
+            return pd.Series(series.sparse.sp_values)
+        return series.sparse.to_dense()
+    return series
+
+
+@symbolic_kind('aggregate')
 @make_symbolic
 def mean(series):
     """
@@ -16,12 +33,13 @@ def mean(series):
         series (pandas.Series): column to summarize.
     """
 
-    if np.issubdtype(series.dtype, np.number):
-        return series.mean()
+    if _is_numeric(series):
+        return _present_values(series).mean()
     else:
         return np.nan
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def first(series, order_by=None):
     """
@@ -41,6 +59,7 @@ def first(series, order_by=None):
     return first_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def last(series, order_by=None):
     """
@@ -60,6 +79,7 @@ def last(series, order_by=None):
     return last_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def nth(series, n, order_by=None):
     """
@@ -82,6 +102,7 @@ def nth(series, n, order_by=None):
         return np.nan
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def n(series):
     """
@@ -95,6 +116,7 @@ def n(series):
     return n_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def n_distinct(series):
     """
@@ -108,6 +130,7 @@ def n_distinct(series):
     return n_distinct_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def IQR(series):
     """
@@ -123,6 +146,7 @@ def IQR(series):
     return iqr_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def colmin(series):
     """
@@ -136,6 +160,7 @@ def colmin(series):
     return min_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def colmax(series):
     """
@@ -149,6 +174,7 @@ def colmax(series):
     return max_s
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def median(series):
     """
@@ -158,12 +184,13 @@ def median(series):
         series (pandas.Series): column to summarize.
     """
 
-    if np.issubdtype(series.dtype, np.number):
-        return series.median()
+    if _is_numeric(series):
+        return _present_values(series).median()
     else:
         return np.nan
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def var(series):
     """
@@ -172,12 +199,13 @@ def var(series):
     Args:
         series (pandas.Series): column to summarize.
     """
-    if np.issubdtype(series.dtype, np.number):
-        return series.var()
+    if _is_numeric(series):
+        return _present_values(series).var()
     else:
         return np.nan
 
 
+@symbolic_kind('aggregate')
 @make_symbolic
 def sd(series):
     """
@@ -187,7 +215,77 @@ def sd(series):
         series (pandas.Series): column to summarize.
     """
 
-    if np.issubdtype(series.dtype, np.number):
-        return series.std()
+    if _is_numeric(series):
+        return _present_values(series).std()
     else:
         return np.nan
+
+
+# ------------------------------------------------------------------------------
+# Grouped implementations
+# ------------------------------------------------------------------------------
+
+def _summarize_each_group(function, series, codes, args, kwargs):
+    """
+    Calls a summary function on each group, passing every Series argument
+    restricted to the rows of the group.
+    """
+
+    summaries = []
+    for code, positions in sorted(pd.Series(codes).groupby(codes).indices.items()):
+        take = lambda a: a.iloc[positions] if isinstance(a, pd.Series) else a
+        summaries.append(function(series.iloc[positions],
+                                  *_recursive_apply(take, args),
+                                  **{k: _recursive_apply(take, v)
+                                     for k, v in kwargs.items()}))
+    return pd.Series(summaries)
+
+
+def _grouped_summary(function, aggregate, kinds=None):
+    """
+    Registers a grouped implementation of a summary function that computes
+    the summary of every group with `aggregate`. Columns whose dtype kind is
+    not in `kinds` (and calls that `aggregate` declines by returning
+    `None`) are summarized one group at a time.
+    """
+
+    @grouped_implementation(function, per_group=True)
+    def implementation(series, codes, *args, **kwargs):
+        summaries = None
+        if isinstance(series.dtype, np.dtype) and (kinds is None or
+                                                   series.dtype.kind in kinds):
+            summaries = aggregate(series.groupby(codes), *args, **kwargs)
+        if summaries is None:
+            return _summarize_each_group(function, series, codes, args, kwargs)
+        ngroups = codes.max() + 1 if len(codes) else 0
+        return summaries.reindex(np.arange(ngroups))
+
+    return implementation
+
+
+def _nth(grouped, n, order_by=None):
+    if order_by is not None or isinstance(n, bool) or not isinstance(n, (int, np.integer)):
+        return None
+    return grouped.nth(n)
+
+
+def _first(grouped, order_by=None):
+    return _nth(grouped, 0, order_by=order_by)
+
+
+def _last(grouped, order_by=None):
+    return _nth(grouped, -1, order_by=order_by)
+
+
+_grouped_summary(mean, lambda grouped: grouped.mean(), 'iuf')
+_grouped_summary(median, lambda grouped: grouped.median(), 'iuf')
+_grouped_summary(var, lambda grouped: grouped.var(), 'iuf')
+_grouped_summary(sd, lambda grouped: grouped.std(), 'iuf')
+_grouped_summary(n, lambda grouped: grouped.size())
+_grouped_summary(n_distinct, lambda grouped: grouped.nunique(dropna=False))
+_grouped_summary(colmin, lambda grouped: grouped.min(), 'iufmM')
+_grouped_summary(colmax, lambda grouped: grouped.max(), 'iufmM')
+_grouped_summary(IQR, lambda grouped: grouped.quantile(.75) - grouped.quantile(.25), 'iuf')
+_grouped_summary(first, _first)
+_grouped_summary(last, _last)
+_grouped_summary(nth, _nth)
@@ -1,7 +1,43 @@
 from .base import *
 
 
-@dfpipe
+def _assign(df, kwargs):
+    """
+    Adds or replaces columns of a DataFrame like `DataFrame.assign`, but only
+    makes a shallow copy so that the untouched columns are not duplicated.
+    """
+
+    df = df.copy(deep=False)
+    for key, value in kwargs.items():
+        df[key] = value(df) if callable(value) else value
+    return df
+
+
+def _grouped_mutate(df, **kwargs):
+    if not all([is_group_vectorizable(v) and
+                (isinstance(v, Intention) or np.isscalar(v))
+                for v in kwargs.values()]):
+        return None
+    codes = group_codes(df)
+    if codes is None:
+        return None
+
+    cache = {}
+    values = {}
+    for key, value in kwargs.items():
+        if isinstance(value, Intention):
+            negate = value.inverted
+            value = evaluate_grouped(value, df, codes, cache)
+            if negate:
+                value = ~value
+        values[key] = value
+    return _assign(df, values)
+
+
+@pipe
+@grouped_kernel(_grouped_mutate)
+@group_delegation
+@symbolic_evaluation(compile_expressions=True, share_subexpressions=True)
 def mutate(df, **kwargs):
     """
     Creates new variables (columns) in the DataFrame specified by keyword
@@ -24,7 +60,7 @@ def mutate(df, **kwargs):
         2  4.05  4.07  2.31      8.12
     """
 
-    return df.assign(**kwargs)
+    return _assign(df, kwargs)
 
 
 @dfpipe
@@ -60,7 +96,9 @@ def mutate_if(df, predicate, fun):
     # return df2
 
 
-@dfpipe
+@pipe
+@group_delegation
+@symbolic_evaluation(compile_expressions=True, share_subexpressions=True)
 def transmute(df, *keep_columns, **kwargs):
     """
     Creates columns and then returns those new columns and optionally specified
@@ -96,6 +134,6 @@ def transmute(df, *keep_columns, **kwargs):
             elif isinstance(col, int):
                 keep_cols.append(df.columns[col])
 
-    df = df.assign(**kwargs)
+    df = _assign(df, kwargs)
     columns = [k for k in kwargs.keys()] + list(keep_cols)
     return df[columns]
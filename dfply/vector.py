@@ -1,11 +1,12 @@
 from .base import *
-import collections
+import collections.abc
 
 
 # ------------------------------------------------------------------------------
 # series ordering
 # ------------------------------------------------------------------------------
 
+@symbolic_kind('window')
 @make_symbolic
 def order_series_by(series, order_series):
     """
@@ -39,6 +40,7 @@ def order_series_by(series, order_series):
         return sorted_series
 
 
+@symbolic_kind('window')
 @make_symbolic
 def desc(series):
     """
@@ -76,6 +78,7 @@ def desc(series):
 # coalesce
 # ------------------------------------------------------------------------------
 
+@symbolic_kind('elementwise')
 @make_symbolic
 def coalesce(*series):
     """
@@ -106,14 +109,15 @@ def coalesce(*series):
     series = [pd.Series(s) for s in series]
     coalescer = pd.concat(series, axis=1)
     min_nonna = np.argmin(pd.isnull(coalescer).values, axis=1)
-    min_nonna = [coalescer.columns[i] for i in min_nonna]
-    return coalescer.lookup(np.arange(coalescer.shape[0]), min_nonna)
+    # picked by position, so that the rows need not have a default index
+    return coalescer.values[np.arange(coalescer.shape[0]), min_nonna]
 
 
 # ------------------------------------------------------------------------------
 # case_when
 # ------------------------------------------------------------------------------
 
+@symbolic_kind('elementwise')
 @make_symbolic
 def case_when(*conditions):
     """
@@ -167,9 +171,9 @@ def case_when(*conditions):
 
     lengths = []
     for logical, outcome in conditions:
-        if isinstance(logical, collections.Iterable):
+        if isinstance(logical, collections.abc.Iterable):
             lengths.append(len(logical))
-        if isinstance(outcome, collections.Iterable) and not isinstance(outcome, str):
+        if isinstance(outcome, collections.abc.Iterable) and not isinstance(outcome, str):
             lengths.append(len(outcome))
     unique_lengths = np.unique(lengths)
     assert len(unique_lengths) == 1
@@ -181,8 +185,13 @@ def case_when(*conditions):
             logical = np.repeat(logical, output_len)
         if isinstance(logical, pd.Series):
             logical = logical.values
-        if not isinstance(outcome, collections.Iterable) or isinstance(outcome, str):
+        if not isinstance(outcome, collections.abc.Iterable) or isinstance(outcome, str):
             outcome = pd.Series(np.repeat(outcome, output_len))
+        elif isinstance(outcome, pd.Series):
+            # aligned with the other outcomes by position
+            outcome = outcome.reset_index(drop=True)
+        else:
+            outcome = outcome.copy()
         outcome[~logical] = np.nan
         output.append(outcome)
 
@@ -193,6 +202,7 @@ def case_when(*conditions):
 # if_else
 # ------------------------------------------------------------------------------
 
+@symbolic_kind('elementwise')
 @make_symbolic
 def if_else(condition, when_true, otherwise):
     """
@@ -215,9 +225,9 @@ def if_else(condition, when_true, otherwise):
     df = pd.DataFrame
     """
 
-    if not isinstance(when_true, collections.Iterable) or isinstance(when_true, str):
+    if not isinstance(when_true, collections.abc.Iterable) or isinstance(when_true, str):
         when_true = np.repeat(when_true, len(condition))
-    if not isinstance(otherwise, collections.Iterable) or isinstance(otherwise, str):
+    if not isinstance(otherwise, collections.abc.Iterable) or isinstance(otherwise, str):
         otherwise = np.repeat(otherwise, len(condition))
     assert (len(condition) == len(when_true)) and (len(condition) == len(otherwise))
 
@@ -235,6 +245,7 @@ def if_else(condition, when_true, otherwise):
 # na_if
 # ------------------------------------------------------------------------------
 
+@symbolic_kind('elementwise')
 @make_symbolic
 def na_if(series, *values):
     """
@@ -245,6 +256,6 @@ def na_if(series, *values):
         *values: Value(s) to convert to `np.nan` in the series.
     """
 
-    series = pd.Series(series)
+    series = pd.Series(series, copy=True)
     series[series.isin(values)] = np.nan
     return series
@@ -5,6 +5,7 @@ from .base import *
 # Window functions
 # ------------------------------------------------------------------------------
 
+@symbolic_kind('window')
 @make_symbolic
 def lead(series, i=1):
     """
@@ -22,6 +23,7 @@ def lead(series, i=1):
     return shifted
 
 
+@symbolic_kind('window')
 @make_symbolic
 def lag(series, i=1):
     """
@@ -39,6 +41,7 @@ def lag(series, i=1):
     return shifted
 
 
+@symbolic_kind('elementwise')
 @make_symbolic
 def between(series, a, b, inclusive=False):
     """
@@ -64,6 +67,7 @@ def between(series, a, b, inclusive=False):
     return met_condition
 
 
+@symbolic_kind('window')
 @make_symbolic
 def dense_rank(series, ascending=True):
     """
@@ -80,6 +84,7 @@ def dense_rank(series, ascending=True):
     return ranks
 
 
+@symbolic_kind('window')
 @make_symbolic
 def min_rank(series, ascending=True):
     """
@@ -96,6 +101,7 @@ def min_rank(series, ascending=True):
     return ranks
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cumsum(series):
     """
@@ -109,6 +115,7 @@ def cumsum(series):
     return sums
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cummean(series):
     """
@@ -123,6 +130,7 @@ def cummean(series):
     return means
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cummax(series):
     """
@@ -137,6 +145,7 @@ def cummax(series):
     return maxes
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cummin(series):
     """
@@ -151,6 +160,7 @@ def cummin(series):
     return mins
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cumprod(series):
     """
@@ -165,6 +175,7 @@ def cumprod(series):
     return prods
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cumany(series):
     """
@@ -179,6 +190,7 @@ def cumany(series):
     return anys
 
 
+@symbolic_kind('window')
 @make_symbolic
 def cumall(series):
     """
@@ -193,6 +205,7 @@ def cumall(series):
     return alls
 
 
+@symbolic_kind('window')
 @make_symbolic
 def percent_rank(series, ascending=True):
     if series.size == 1:
@@ -201,6 +214,7 @@ def percent_rank(series, ascending=True):
     return percents
 
 
+@symbolic_kind('window')
 @make_symbolic
 def row_number(series, ascending=True):
     """
@@ -226,3 +240,100 @@ def row_number(series, ascending=True):
 
     series_rank = series.rank(method='first', ascending=ascending)
     return series_rank
+
+
+# ------------------------------------------------------------------------------
+# Grouped window functions
+# ------------------------------------------------------------------------------
+
+@grouped_implementation(lead)
+def _grouped_lead(series, codes, i=1):
+    return series.groupby(codes).shift(i * -1)
+
+
+@grouped_implementation(lag)
+def _grouped_lag(series, codes, i=1):
+    return series.groupby(codes).shift(i)
+
+
+@grouped_implementation(dense_rank)
+def _grouped_dense_rank(series, codes, ascending=True):
+    return series.groupby(codes).rank(method='dense', ascending=ascending)
+
+
+@grouped_implementation(min_rank)
+def _grouped_min_rank(series, codes, ascending=True):
+    return series.groupby(codes).rank(method='min', ascending=ascending)
+
+
+@grouped_implementation(row_number)
+def _grouped_row_number(series, codes, ascending=True):
+    return series.groupby(codes).rank(method='first', ascending=ascending)
+
+
+@grouped_implementation(percent_rank)
+def _grouped_percent_rank(series, codes, ascending=True):
+    grouped = series.groupby(codes)
+    sizes = grouped.transform('size')
+    if (sizes == 1).all():
+        return pd.Series(0, index=series.index)
+    ranks = grouped.rank(method='min', ascending=ascending)
+    percents = (ranks - 1) / (sizes - 1)
+    percents[sizes == 1] = 0
+    return percents
+
+
+def _each_group(series, codes, method):
+    # the Series method applied to each group separately, for dtypes where
+    # the groupby version gives other results (booleans, datetimes, objects
+    # and extension dtypes)
+    return series.groupby(codes, group_keys=False).apply(lambda s: getattr(s, method)())
+
+
+def _is_numpy_number(series):
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iuf'
+
+
+@grouped_implementation(cumsum)
+def _grouped_cumsum(series, codes):
+    if not _is_numpy_number(series):
+        return _each_group(series, codes, 'cumsum')
+    return series.groupby(codes).cumsum()
+
+
+@grouped_implementation(cumprod)
+def _grouped_cumprod(series, codes):
+    if not _is_numpy_number(series):
+        return _each_group(series, codes, 'cumprod')
+    prods = series.groupby(codes).cumprod()
+    if series.dtype.kind in 'iu' and prods.dtype.kind == 'f':
+        # groupby multiplies integers as floats, which is only exact up to
+        # 2 ** 53
+        if prods.abs().max() < 2 ** 53:
+            return prods.astype(series.dtype)
+        return _each_group(series, codes, 'cumprod')
+    return prods
+
+
+@grouped_implementation(cummean)
+def _grouped_cummean(series, codes):
+    sums = series.fillna(0).groupby(codes).cumsum()
+    counts = series.notnull().groupby(codes).cumsum()
+    return (sums / counts).astype(float)
+
+
+def _grouped_expanding(series, codes, method):
+    # expanding() carries the running value over missing values, whereas
+    # the groupby cumulative functions leave them missing
+    values = getattr(series.groupby(codes), method)()
+    return values.groupby(codes).ffill().astype(float)
+
+
+@grouped_implementation(cummax)
+def _grouped_cummax(series, codes):
+    return _grouped_expanding(series, codes, 'cummax')
+
+
+@grouped_implementation(cummin)
+def _grouped_cummin(series, codes):
+    return _grouped_expanding(series, codes, 'cummin')
@@ -10,7 +10,7 @@ setup(
     include_package_data=True,
     package_data={'dfply': ['data/diamonds.csv']},
     package_dir={'dfply':'dfply'},
-    install_requires=['numpy', 'pandas'],
+    install_requires=['numpy', 'pandas>=1.1.0'],
     description = 'dplyr-style piping operations for pandas dataframes',
     long_description = 'See https://github.com/kieferk/dfply/blob/master/README.md for details.',
     license = 'GNU General Public License v3.0',
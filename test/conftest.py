@@ -0,0 +1,13 @@
+import pytest
+
+from dfply import *
+
+
+@dfpipe
+def _cheapest(df, k):
+    return df.sort_values('price', kind='mergesort').head(k)
+
+
+@pytest.fixture
+def cheapest():
+    return _cheapest
@@ -26,3 +26,171 @@ def test_inplace_pipe():
     print(df)
     print(d)
     assert df.equals(d)
+
+
+def test_copy_on_write_pipe():
+    df = diamonds.head(100)
+    original = df.copy()
+    set_option('copy_on_write', True)
+    try:
+        d = df >> group_by(X.cut) >> head(5)
+        assert d._grouped_by == ['cut']
+        assert not hasattr(df, '_grouped_by') or df._grouped_by is None
+
+        d = df >> mutate(price=X.price * 2, new=X.x + X.y)
+        assert (d.price == original.price * 2).all()
+        assert np.shares_memory(d.carat.values, df.carat.values)
+        assert original.equals(df)
+
+        d = df >> mutate_if(lambda col: col.dtype == float, lambda col: col * 0)
+        assert original.equals(df)
+
+        # elementwise functions write into copies of the columns they are given
+        d = df >> mutate(x=na_if(X.x, df.x.iloc[1]))
+        assert d.x.isnull().any()
+        assert original.equals(df)
+        d = df >> mutate(y=case_when([X.price > 340, X.y], [True, 0.]))
+        assert (d.y[df.price <= 340] == 0.).all()
+        assert original.equals(df)
+    finally:
+        set_option('copy_on_write', False)
+
+
+def test_unknown_option():
+    with pytest.raises(KeyError):
+        set_option('not_an_option', True)
+
+
+def test_copy_on_write_pandas_version(monkeypatch):
+    monkeypatch.setattr(pd, '__version__', '1.4.4')
+    with pytest.raises(ValueError):
+        set_option('copy_on_write', True)
+    assert not options['copy_on_write']
+    set_option('copy_on_write', False)
+
+
+def test_compile_intention():
+    df = pd.DataFrame({
+        'a': np.arange(10, dtype=float),
+        'b': np.arange(10),
+        'c': list('abcdefghij')
+    })
+    compiled = compile_intention((X.a * X.b + 1) / (2 - X.a), df)
+    if numexpr is None:
+        assert compiled is None
+    else:
+        expected = (df.a * df.b + 1) / (2 - df.a)
+        assert compiled().equals(expected)
+        assert compiled().name is None
+        assert compile_intention(-X.a * 2, df)().name == 'a'
+        assert compile_intention((X.a > 3) & (X.b < 8), df)().equals((df.a > 3) & (df.b < 8))
+
+    # unsupported operands and operators are left to pandas
+    assert compile_intention(X.c == 'a', df) is None
+    assert compile_intention(X.a.mean() + 1, df) is None
+    assert compile_intention(X.a // 2, df) is None
+    assert compile_intention(X.a ** 2, df) is None
+    assert compile_intention(abs(X.b), df) is None
+    assert compile_intention(-(X.a > 3), df) is None
+
+
+def test_compiled_mutate_and_mask():
+    df = diamonds[['carat', 'price', 'x', 'y', 'z']]
+    expected_mutate = df >> mutate(v=X.x * X.y * X.z, r=X.price / X.carat)
+    expected_mask = df >> mask((X.price > 1000) & (X.x > X.y), X.carat < 1)
+    compile_min_rows = options['compile_min_rows']
+    set_option('compile_min_rows', 0)
+    try:
+        assert expected_mutate.equals(df >> mutate(v=X.x * X.y * X.z, r=X.price / X.carat))
+        assert expected_mask.equals(df >> mask((X.price > 1000) & (X.x > X.y), X.carat < 1))
+    finally:
+        set_option('compile_min_rows', compile_min_rows)
+
+
+def test_compiled_integer_expressions():
+    n = options['compile_min_rows']
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({'a': rng.randint(-3, 4, n), 'b': rng.randint(0, 5, n),
+                       'f': rng.rand(n) - 0.5})
+    expressions = dict(p=X.b ** abs(X.a), r=2 ** X.b, a=abs(X.a), n=-X.a,
+                       q=X.f ** 2, s=X.a * 3 - X.b, d=X.a / X.b, g=abs(X.f))
+    compiled = df >> mutate(**expressions)
+    set_option('compile_expressions', False)
+    try:
+        expected = df >> mutate(**expressions)
+    finally:
+        set_option('compile_expressions', True)
+    assert compiled.equals(expected)
+    assert compiled.a.dtype == np.int64
+
+    with pytest.raises(ValueError):
+        df >> mutate(r=2 ** X.a)
+
+
+def test_expression_key():
+    assert expression_key(X.x / X.y) == expression_key(X.x / X.y)
+    assert expression_key(X.x / X.y) != expression_key(X.y / X.x)
+    assert expression_key(X.x + 1) != expression_key(X.x + 1.5)
+    assert expression_key(X.x * 0.0) != expression_key(X.x * -0.0)
+    assert expression_key(X.x + np.nan) == expression_key(X.x + np.nan)
+    assert expression_key(mean(X.x)) == expression_key(mean(X.x))
+    assert expression_key(lag(X.x, 2)) != expression_key(lag(X.x, 3))
+    assert expression_key(Intention(lambda df: df.x)) is None
+
+    # dicts with keys of mixed types or None
+    mapping = {'Ideal': 1, 2: 'x'}
+    assert expression_key(X.cut.map(mapping)) == expression_key(X.cut.map(dict(mapping)))
+    assert expression_key(X.cut.map({1: 'a'})) != expression_key(X.cut.map({True: 'a'}))
+    d = diamonds.head(50)
+    assert (d >> mutate(y=X.cut.map(mapping))).y.equals(d.cut.map(mapping))
+    c = d >> mask(X.color.replace({None: 'q', 'E': 'e'}) == 'e')
+    assert c.equals(d[d.color == 'E'])
+    c = d >> summarize(n=X.color.replace({None: 'q', 'E': 'e'}).nunique())
+    assert c.n.iloc[0] == d.color.nunique()
+
+
+def test_shared_subexpressions():
+    calls = []
+
+    @make_symbolic
+    def counted_ratio(a, b):
+        calls.append(1)
+        return a / b
+
+    df = diamonds.head(50)
+    d = df >> mutate(r=counted_ratio(X.x, X.y),
+                     r2=counted_ratio(X.x, X.y) ** 2,
+                     a=counted_ratio(X.x, X.y).abs())
+    assert len(calls) == 1
+    assert d.r2.equals(d.r ** 2)
+    assert d.a.equals(d.r.abs())
+
+    # constants that compare equal are not shared when they behave differently
+    d = df >> mutate(p=X.x * 0.0, n=X.x * -0.0)
+    assert (1 / d.p > 0).all() and (1 / d.n < 0).all()
+
+    del calls[:]
+    d = df >> group_by(X.cut) >> summarize(m=counted_ratio(X.x, X.y).mean(),
+                                           s=counted_ratio(X.x, X.y).std())
+    assert len(calls) == d.shape[0]
+
+
+def test_group_executor(cheapest):
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    grouped = diamonds.head(2000) >> group_by(X.cut, X.color)
+    for k in [3, 1000]:
+        expected = cheapest.function._apply(grouped, k)
+        with ThreadPoolExecutor(4) as pool:
+            d = grouped >> cheapest(k).using(pool)
+        assert d.equals(expected)
+        assert d._grouped_by == ['cut', 'color']
+        with ProcessPoolExecutor(2) as pool:
+            assert (grouped >> cheapest(k).using(pool)).equals(expected)
+
+    with ThreadPoolExecutor(2) as pool:
+        set_option('group_executor', pool)
+        try:
+            d = grouped >> cheapest(2)
+        finally:
+            set_option('group_executor', None)
+    assert d.equals(cheapest.function._apply(grouped, 2))
@@ -1,3 +1,5 @@
+import warnings
+
 import pytest
 
 from dfply import *
@@ -11,3 +13,73 @@ def test_group_attributes():
     d = diamonds >> group_by('cut')
     assert hasattr(d, '_grouped_by')
     assert d._grouped_by == ['cut',]
+
+
+def test_group_index():
+    d = diamonds >> group_by(X.cut, X.color)
+    group_index = d._group_index
+    grouped = diamonds.groupby(['cut', 'color'])
+    assert (group_index.codes == grouped.ngroup().values).all()
+    assert group_index.keys.equals(grouped.size().index)
+    assert (group_index.sizes == grouped.size().values).all()
+
+    # carried through verbs that keep the grouping columns
+    d2 = d >> mutate(p=lag(X.price))
+    assert d2._group_index.codes is group_index.codes
+    d3 = d2 >> mutate(cut=X.color)
+    assert getattr(d3, '_group_index', None) is None
+    assert (get_group_index(d3).codes ==
+            d3.groupby(['cut', 'color']).ngroup().values).all()
+
+    # not carried through functions that may modify grouping values in place
+    @pipe
+    def relabel(df):
+        df.loc[df.price > 1000, 'cut'] = 'Pricey'
+        return df
+
+    counts = diamonds >> group_by(X.cut) >> relabel() >> summarize(n=n(X.price))
+    expected = diamonds.assign(cut=diamonds.cut.where(diamonds.price <= 1000, 'Pricey'))
+    assert counts.n.tolist() == expected.groupby('cut').size().tolist()
+    assert 'Pricey' in counts.cut.tolist()
+    assert (d >> mutate(p=X.price))._group_index.codes is group_index.codes
+
+    # derived for a subset of rows without hashing
+    rows = (diamonds.cut == 'Ideal').values
+    subset = d[rows]
+    subset._grouped_by = ['cut', 'color']
+    derived = group_index.take(rows, subset)
+    assert derived.is_valid_for(subset)
+    assert (derived.codes == subset.groupby(['cut', 'color']).ngroup().values).all()
+    assert derived.keys.equals(subset.groupby(['cut', 'color']).size().index)
+
+    assert (d >> ungroup())._group_index is None
+
+
+def test_sorted_group_index(cheapest):
+    df = diamonds.head(3000).sort_values(['cut', 'color'], kind='mergesort')
+    d = df >> group_by(X.cut, X.color)
+    grouped = df.groupby(['cut', 'color'])
+    assert d._group_index.contiguous
+    assert (d._group_index.codes == grouped.ngroup().values).all()
+    assert d._group_index.keys.equals(grouped.size().index)
+    assert not (diamonds >> group_by(X.cut))._group_index.contiguous
+    assert (df >> group_by(X.cut, X.color, presorted=True))._group_index.contiguous
+
+    # groups of sorted frames are applied as slices
+    for verb, args in [(cheapest, (2,)), (cheapest, (1000,))]:
+        expected = reset_group_index(d, grouped.apply(verb.function.function, *args))
+        assert (d >> verb(*args)).equals(expected)
+    expected = reset_group_index(
+        d, grouped.apply(summarize.function.function, m=X.price.mean()))
+    assert (d >> summarize(m=X.price.mean())).equals(expected)
+
+    # columns can be assigned to the slices without warnings
+    @dfpipe
+    def add_ratio(df):
+        df['ratio'] = df.price / df.carat
+        return df
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        c = d >> add_ratio()
+    assert (c.ratio == df.price / df.carat).all()
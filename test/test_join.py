@@ -97,6 +97,288 @@ def test_anti_join(dfA, dfB):
     assert c.equals(ab)
 
 
+def test_semi_anti_join_composite_keys():
+    left = pd.DataFrame({
+        'k1': ['a', 'b', 'a', 'c', 'b', np.nan],
+        'k2': [1, 2, 2, 1, 2, 3],
+        'v': range(6)
+    })
+    right = pd.DataFrame({
+        'key': ['b', 'a', 'b', np.nan],
+        'k2': [2, 1, 2, 3],
+    })
+
+    c = left >> semi_join(right, by=[('k1', 'key'), 'k2'])
+    assert c.equals(left.iloc[[0, 1, 4, 5]].reset_index(drop=True))
+
+    c = left >> anti_join(right, by=[('k1', 'key'), 'k2'])
+    assert c.equals(left.iloc[[2, 3]])
+
+    c = left >> semi_join(right, by=('k1', 'key'))
+    assert c.equals(left.iloc[[0, 1, 2, 4, 5]].reset_index(drop=True))
+
+    # rows keep the left order rather than being grouped by key, and
+    # anti_join indexes them by their left position
+    left = pd.DataFrame({'k': ['b', 'a', 'c', 'b', 'a'], 'v': range(5)},
+                        index=list('pqrst'))
+    right = pd.DataFrame({'k': ['a', 'b']})
+    c = left >> semi_join(right, by='k')
+    assert c.v.tolist() == [0, 1, 3, 4]
+    assert c.index.tolist() == [0, 1, 2, 3]
+    c = left >> anti_join(pd.DataFrame({'k': ['b']}), by='k')
+    assert c.v.tolist() == [1, 2, 4]
+    assert c.index.tolist() == [1, 2, 4]
+
+
+def test_chunked_semi_anti_join():
+    left = diamonds.sample(5000, random_state=1)
+    right = diamonds.sample(1000, random_state=2)
+    chunks = [right.iloc[i:i + 300] for i in range(0, 1000, 300)]
+    for by in ['price', ['cut', 'color', 'clarity']]:
+        for options in [{}, {'expected_keys': 1000},
+                        {'memory_budget': 16, 'false_positive_rate': 0.5}]:
+            c = left >> semi_join(chunks, by=by, **options)
+            assert c.equals(left >> semi_join(right, by=by))
+            c = left >> anti_join(lambda: iter(chunks), by=by, **options)
+            assert c.equals(left >> anti_join(right, by=by))
+
+    # signed zeros are equal keys, as in merge
+    left = pd.DataFrame({'k': [0.0, 1.0, 2.0], 'v': [1, 2, 3]})
+    right = pd.DataFrame({'k': [-0.0, 2.0]})
+    assert (left >> semi_join([right], by='k')).equals(left >> semi_join(right, by='k'))
+    assert (left >> semi_join([right], by='k')).v.tolist() == [1, 3]
+    assert (left >> anti_join([right], by='k')).equals(left >> anti_join(right, by='k'))
+
+
+def test_asof_join():
+    rng = np.random.RandomState(0)
+    trades = pd.DataFrame({'t': rng.randint(0, 1000, 500).astype(float),
+                           'tick': rng.choice(list('abcd'), 500)})
+    trades.loc[::37, 't'] = np.nan
+    quotes = pd.DataFrame({'t': rng.randint(0, 1000, 100).astype(float),
+                           'tick': rng.choice(list('abce'), 100),
+                           'px': rng.rand(100)})
+    matched = trades.t.notnull().values
+    left = trades[matched].assign(pos=np.flatnonzero(matched))
+    left = left.sort_values('t', kind='mergesort')
+    for direction in ['backward', 'forward', 'nearest']:
+        for options in [{}, {'allow_exact_matches': False, 'tolerance': 5}]:
+            c = trades >> asof_join(quotes, on='t', by='tick', direction=direction, **options)
+            expected = pd.merge_asof(left, quotes.sort_values('t', kind='mergesort'), on='t',
+                                     by='tick', direction=direction, **options)
+            expected = expected.sort_values('pos')
+            assert list(c.columns) == ['t', 'tick', 'px']
+            assert c.px[~matched].isnull().all()
+            assert np.allclose(c.px[matched].fillna(-1).values,
+                               expected.px.fillna(-1).values)
+
+    # integer keys above 2 ** 53 are told apart
+    base = 2 ** 60
+    left = pd.DataFrame({'t': np.array([base + 1, base + 3, base + 4], dtype=np.int64)})
+    right = pd.DataFrame({'t': np.array([base, base + 2, base + 5], dtype=np.int64),
+                          'px': [0, 1, 2]})
+    for direction, expected in [('backward', [0, 1, 1]), ('forward', [1, 2, 2]),
+                                ('nearest', [0, 1, 2])]:
+        c = left >> asof_join(right, on='t', direction=direction)
+        assert c.px.tolist() == expected
+    c = left >> asof_join(right, on='t', allow_exact_matches=False, tolerance=1)
+    assert c.px.isnull().tolist() == [False, False, True]
+    assert c.px.tolist()[:2] == [0, 1]
+    intervals = pd.DataFrame({'s': [base + 1, base + 4], 'e': [base + 3, base + 4], 'id': [0, 1]})
+    c = left >> interval_join(intervals, on='t', start='s', end='e')
+    assert c.id.tolist() == [0, 0, 1]
+
+    # an empty right side matches nothing
+    for direction in ['backward', 'forward', 'nearest']:
+        c = trades >> asof_join(quotes.head(0), on='t', by='tick', direction=direction)
+        assert list(c.columns) == ['t', 'tick', 'px']
+        assert c.shape[0] == trades.shape[0]
+        assert c.px.isnull().all()
+
+
+def test_interval_join():
+    rng = np.random.RandomState(1)
+    events = pd.DataFrame({'t': rng.randint(0, 500, 300),
+                           'user': rng.choice(list('abc'), 300)})
+    sessions = pd.DataFrame({'s': rng.randint(0, 500, 60),
+                             'user': rng.choice(list('abc'), 60)})
+    sessions['e'] = sessions.s + rng.randint(0, 40, 60)
+    sessions['id'] = range(60)
+
+    c = events >> interval_join(sessions, on='t', start='s', end='e', by='user')
+    cross = events.reset_index().merge(sessions, on='user')
+    expected = cross[(cross.s <= cross.t) & (cross.t <= cross.e)].sort_values(['index', 'id'])
+    assert list(c.columns) == ['t', 'user', 's', 'e', 'id']
+    assert (c.id.values == expected.id.values).all()
+
+    c = events >> interval_join(sessions, on='t', start='s', end='e', by='user',
+                                how='left', closed='neither')
+    inside = cross[(cross.s < cross.t) & (cross.t < cross.e)]
+    assert c.shape[0] == inside.shape[0] + (~events.index.isin(inside['index'])).sum()
+    assert (c.id.notnull()).sum() == inside.shape[0]
+
+    # long intervals are matched like short ones, for every closed side
+    sessions = pd.concat([sessions, pd.DataFrame({'s': [0, 100], 'user': ['a', 'b'],
+                                                  'e': [500, 400], 'id': [60, 61]})],
+                         ignore_index=True)
+    cross = events.reset_index().merge(sessions, on='user')
+    for closed, lower, upper in [('both', cross.s <= cross.t, cross.t <= cross.e),
+                                 ('left', cross.s <= cross.t, cross.t < cross.e),
+                                 ('right', cross.s < cross.t, cross.t <= cross.e),
+                                 ('neither', cross.s < cross.t, cross.t < cross.e)]:
+        c = events >> interval_join(sessions, on='t', start='s', end='e', by='user',
+                                    closed=closed)
+        expected = cross[lower & upper].sort_values(['index', 'id'])
+        assert (c.id.values == expected.id.values).all()
+
+
+def test_sort_merge_join():
+    left = diamonds.head(2000).sort_values('price', kind='mergesort')
+    right = diamonds.tail(1000)[['price', 'carat', 'depth']].sort_values('price', kind='mergesort')
+    for how, verb in [('inner', inner_join), ('left', left_join), ('right', right_join)]:
+        expected = left.merge(right, how=how, on='price')
+        assert (left >> verb(right, by='price')).equals(expected)
+        assert (left >> verb(right, by='price', presorted=True)).equals(expected)
+        assert (left >> verb(right, by='price', presorted=False)).equals(expected)
+
+    d = left >> outer_join(right, by='price', presorted=True)
+    assert d.equals(left.merge(right, how='outer', on='price', sort=True))
+    assert d.price.is_monotonic_increasing
+    d = left >> outer_join(right, by='price')
+    assert d.equals(left.merge(right, how='outer', on='price'))
+
+    left_rows, right_rows = sort_merge_positions(np.array([1, 2, 2, 5]), np.array([0, 2, 2, 3]), 'outer')
+    assert list(left_rows) == [-1, 0, 1, 1, 2, 2, -1, 3]
+    assert list(right_rows) == [0, -1, 1, 2, 1, 2, 3, -1]
+
+
+def test_join_size_checks(dfA, dfB):
+    left = diamonds.head(500)
+    right = diamonds.tail(300)
+    for how in ['inner', 'left', 'right', 'outer']:
+        for by in ['cut', ['cut', 'color']]:
+            expected = left.merge(right, how=how, on=by).shape[0]
+            assert join_cardinality(left, right, how, by=by) == expected
+
+    with pytest.raises(pd.errors.MergeError):
+        left >> inner_join(right, by='cut', max_rows=1000)
+    assert (left >> inner_join(right, by='depth', max_rows=5000)).equals(
+        left >> inner_join(right, by='depth'))
+    set_option('join_max_bytes', 10 ** 4)
+    try:
+        with pytest.raises(pd.errors.MergeError):
+            left >> outer_join(prepare_join(right, by='cut'))
+    finally:
+        set_option('join_max_bytes', None)
+
+    assert (dfA >> inner_join(dfB, by='x1', validate='one_to_one')).equals(dfA >> inner_join(dfB, by='x1'))
+    with pytest.raises(pd.errors.MergeError):
+        dfA >> left_join(dfB >> bind_rows(dfB), by='x1', validate='m:1')
+
+
+def test_pack_join_keys():
+    left = pd.DataFrame({'a': ['x', 'y', None, 'x'], 'b': [1, 2, 3, 1], 'c': [1.0, np.nan, 2.0, 1.0]})
+    right = pd.DataFrame({'a': [None, 'x', 'y'], 'b': [3, 1, 2], 'c': [2.0, 1.0, 3.0]})
+    left_keys, right_keys = pack_join_keys(left, right)
+    assert left_keys.dtype == np.int64
+    assert left_keys[0] == left_keys[3] == right_keys[1]
+    assert left_keys[2] == right_keys[0]
+    assert left_keys[1] not in right_keys
+
+    # keys are renumbered instead of overflowing
+    wide = pd.DataFrame({i: np.arange(1000) for i in range(8)})
+    left_keys, right_keys = pack_join_keys(wide, wide.iloc[::-1])
+    assert (left_keys == right_keys[::-1]).all()
+    assert len(np.unique(left_keys)) == 1000
+
+
+def test_bloom_filter():
+    from dfply.join import BloomFilter
+    bloom = BloomFilter.for_keys(10000, false_positive_rate=0.01)
+    bloom.add(np.arange(10000, dtype=np.uint64) * np.uint64(2654435761))
+    assert bloom.might_contain(np.arange(10000, dtype=np.uint64) * np.uint64(2654435761)).all()
+    others = np.arange(10000, 60000, dtype=np.uint64) * np.uint64(2654435761)
+    assert bloom.might_contain(others).mean() < 0.05
+
+
+def test_prepare_join():
+    left = diamonds.sample(2000, random_state=1)
+    right = diamonds.sample(500, random_state=2).assign(n=range(500))
+    right.loc[right.index[:20], 'depth'] = np.nan
+    for by in ['depth', ['cut', 'color'], [('price', 'price'), 'cut']]:
+        index = prepare_join(right, by=by)
+        for verb in [inner_join, left_join, semi_join, anti_join, right_join]:
+            assert (left >> verb(index)).equals(left >> verb(right, by=by))
+
+    # missing values in composite keys only match missing values
+    left = pd.DataFrame({'k': ['a', 'a', 'b', 'b', np.nan], 'j': ['q', 'p', 'p', 'q', 'q'],
+                         'x': range(5)})
+    right = pd.DataFrame({'k': [np.nan, np.nan, 'a'], 'j': ['p', 'p', 'q'], 'y': range(3)})
+    index = prepare_join(right, by=['k', 'j'])
+    assert (left >> inner_join(index)).shape[0] == 1
+    for verb in [inner_join, left_join, semi_join, anti_join]:
+        assert (left >> verb(index)).equals(left >> verb(right, by=['k', 'j']))
+
+    with pytest.raises(ValueError):
+        prepare_join(right, by=None)
+
+    # joins with an empty side are laid out like merge does
+    for l, r in [(left.head(0), right), (left, right.head(0))]:
+        index = prepare_join(r, by=['k', 'j'])
+        for verb in [inner_join, left_join, semi_join, anti_join, right_join]:
+            assert (l >> verb(index)).equals(l >> verb(r, by=['k', 'j']))
+
+
+def test_star_join():
+    fact = diamonds.sample(2000, random_state=1)
+    cuts = pd.DataFrame({'cut_name': ['Ideal', 'Premium', 'Good'], 'cut_rank': [1, 2, 3]})
+    colors = pd.DataFrame({'color': list('DEFGD'), 'color_rank': range(5)})
+    clarity = prepare_join(diamonds[['clarity', 'color']].drop_duplicates()
+                           .assign(n=range(56)).head(40), by=['clarity', 'color'])
+
+    d = fact >> star_join({('cut', 'cut_name'): cuts, 'color': colors, 'depth': fact[['depth']].head(5)})
+    chained = (fact >> left_join(cuts, by=('cut', 'cut_name'))
+               >> left_join(colors, by='color') >> left_join(fact[['depth']].head(5), by='depth'))
+    assert d.equals(chained)
+
+    d = fact >> star_join([clarity, prepare_join(colors, by='color')])
+    assert d.equals(fact >> left_join(clarity) >> left_join(colors, by='color'))
+
+    # overlapping columns are suffixed like the chained joins
+    d = fact >> star_join({'color': colors, 'cut': cuts.rename(columns={'cut_name': 'cut',
+                                                                        'cut_rank': 'color_rank'})})
+    assert 'color_rank_x' in d.columns
+    assert d.equals(fact >> left_join(colors, by='color') >> left_join(
+        cuts.rename(columns={'cut_name': 'cut', 'cut_rank': 'color_rank'}), by='cut'))
+
+    # missing values in composite dimension keys
+    fact = pd.DataFrame({'k': [3, 'a', np.nan, 'b'], 'j': ['c', 'c', 'c', 'd']})
+    dims = pd.DataFrame({'k': [np.nan, 'a', 'b'], 'j': ['c', 'c', 'd'], 'w': [1, 2, 3]})
+    d = fact >> star_join([prepare_join(dims, by=['k', 'j'])])
+    assert d.equals(fact >> left_join(dims, by=['k', 'j']))
+    assert d.w.isnull().tolist() == [True, False, False, False]
+    assert d.w.tolist()[1:] == [2, 1, 3]
+
+
+def test_partitioned_join():
+    from concurrent.futures import ThreadPoolExecutor
+    left = diamonds.sample(3000, random_state=1)
+    right = diamonds.sample(500, random_state=2)[['cut', 'color', 'depth', 'price']]
+    right.loc[right.index[:20], 'depth'] = np.nan
+    with ThreadPoolExecutor(4) as pool:
+        for by in ['depth', ['cut', 'color'], [('price', 'price'), 'cut']]:
+            for verb in [inner_join, left_join, right_join, outer_join]:
+                expected = left >> verb(right, by=by)
+                d = left >> verb(right, by=by, partitions=7)
+                assert d.equals(expected)
+                d = left >> verb(right, by=by, partitions=4).using(pool)
+                assert d.equals(expected)
+
+                # joins with an empty side are laid out like merge does
+                for l, r in [(left.head(0), right), (left, right.head(0))]:
+                    assert (l >> verb(r, by=by, partitions=7)).equals(l >> verb(r, by=by))
+
+
 ##==============================================================================
 ## set operation (row join) test functions
 ##==============================================================================
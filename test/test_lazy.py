@@ -0,0 +1,90 @@
+import pytest
+
+from dfply import *
+
+
+##==============================================================================
+## lazy plan tests
+##==============================================================================
+
+def test_lazy_collect_matches_eager():
+    eager = (diamonds >> mutate(ratio=X.x / X.y, unused=X.z * 2) >>
+             arrange(X.price, kind='mergesort') >> mask(X.cut == 'Ideal', X.carat > 1) >>
+             select(X.ratio, X.price))
+    plan = (lazy(diamonds) >> mutate(ratio=X.x / X.y, unused=X.z * 2) >>
+            arrange(X.price, kind='mergesort') >> mask(X.cut == 'Ideal', X.carat > 1) >>
+            select(X.ratio, X.price))
+    assert eager.equals(plan.collect())
+
+    # sized constants are aligned with the rows they are assigned to
+    d = diamonds.head(100)
+    plan = lazy(d) >> mutate(a=list(range(100))) >> mask(X.price > 340)
+    assert plan.explain().split('\n')[1:] == ['mutate', 'mask']
+    assert plan.collect().equals(d >> mutate(a=list(range(100))) >> mask(X.price > 340))
+
+    # unstable sorts may order ties differently after a mask
+    plan = lazy(diamonds) >> arrange(X.price) >> mask(X.cut == 'Ideal')
+    assert plan.explain().split('\n')[1:] == ['arrange', 'mask']
+    assert plan.collect().equals(diamonds >> arrange(X.price) >> mask(X.cut == 'Ideal'))
+
+
+def test_lazy_is_not_evaluated_until_collect():
+    plan = lazy(diamonds) >> mask(X.price > 1000) >> head(3)
+    assert isinstance(plan, LazyFrame)
+    assert plan.collect().equals(diamonds >> mask(X.price > 1000) >> head(3))
+
+
+def test_lazy_predicate_pushdown():
+    plan = (lazy(diamonds) >> mutate(ratio=X.x / X.y) >> arrange(X.price, kind='mergesort') >>
+            mask(X.cut == 'Ideal') >> select(X.ratio, X.price))
+    assert plan.explain().split('\n')[1:] == ['mask', 'mutate', 'arrange', 'select']
+
+    # masks on created columns or aggregates stay where they are
+    plan = lazy(diamonds) >> mutate(ratio=X.x / X.y) >> mask(X.ratio > 1)
+    assert plan.explain().split('\n')[1:] == ['mutate', 'mask']
+    plan = lazy(diamonds) >> mutate(m=X.price - mean(X.price)) >> mask(X.cut == 'Ideal')
+    assert plan.explain().split('\n')[1:] == ['mutate', 'mask']
+    plan = lazy(diamonds) >> arrange(X.price) >> mask(lag(X.price) > 500)
+    assert plan.explain().split('\n')[1:] == ['arrange', 'mask']
+    plan = (lazy(diamonds) >> mutate(c=X.color.str.cat(), u=X.color.str.lower()) >>
+            mask(X.cut == 'Ideal'))
+    assert plan.explain().split('\n')[1:] == ['mutate', 'mask']
+    plan = lazy(diamonds) >> mutate(u=X.color.str.lower()) >> mask(X.cut == 'Ideal')
+    assert plan.explain().split('\n')[1:] == ['mask', 'mutate']
+
+
+def test_lazy_projection_pushdown():
+    plan = (lazy(diamonds) >> mutate(ratio=X.x / X.y, unused=X.depth * 2) >>
+            mask(X.cut == 'Ideal') >> select(X.ratio, X.price))
+    optimized = plan.optimize()
+    assert list(optimized.source.columns) == ['cut', 'price', 'x', 'y']
+    assert list(optimized.stages[1].kwargs.keys()) == ['ratio']
+
+    plan = lazy(diamonds) >> group_by(X.cut) >> summarize(price=mean(X.price))
+    assert list(plan.optimize().source.columns) == ['cut', 'price']
+    assert plan.collect().equals(diamonds >> group_by(X.cut) >>
+                                 summarize(price=mean(X.price)))
+
+    # positional and dynamic selections keep every column
+    plan = lazy(diamonds) >> select(starts_with('c'))
+    assert plan.optimize().source.shape[1] == diamonds.shape[1]
+    plan = lazy(diamonds) >> mutate(a=X.x * 2) >> select(0, X.a)
+    assert plan.optimize().source.shape[1] == diamonds.shape[1]
+
+    # dropped columns must still reach the drop
+    plan = lazy(diamonds) >> drop(X.x) >> mask(X.y > 4) >> select(X.y)
+    assert list(plan.optimize().source.columns) == ['x', 'y']
+    assert plan.collect().equals(diamonds >> drop(X.x) >> mask(X.y > 4) >> select(X.y))
+
+
+def test_lazy_elementwise_vector_functions():
+    # rows without a default index, so positions and labels differ
+    d = diamonds.iloc[1000:1300]
+    for value in [coalesce(X.x, X.y), case_when([X.x > 5, X.y], [True, X.z]),
+                  if_else(X.x > 5, X.y, X.z), na_if(X.x, d.x.iloc[0])]:
+        plan = lazy(d) >> mutate(a=value) >> mask(X.cut == 'Ideal') >> select(X.a)
+        expected = d >> mutate(a=value) >> mask(X.cut == 'Ideal') >> select(X.a)
+        assert plan.collect().equals(expected)
+
+    plan = lazy(d) >> mutate(a=coalesce(X.x, X.y)) >> mask(X.cut == 'Ideal')
+    assert plan.explain().split('\n')[1:] == ['mask', 'mutate']
@@ -57,6 +57,7 @@ def test_gather(elongated):
     variables = ['price','depth','x','y','z']
     id_vars = [c for c in diamonds.columns if c not in variables]
     df = pd.melt(diamonds, id_vars, variables, 'variable', 'value')
+    df['variable'] = pd.Categorical(df['variable'], categories=variables)
 
     assert df.equals(d)
 
@@ -65,16 +66,52 @@ def test_gather(elongated):
     variables = diamonds.columns.tolist()
     id_vars = []
     df = pd.melt(diamonds, id_vars, variables, 'variable', 'value')
+    df['variable'] = pd.Categorical(df['variable'], categories=variables)
 
     assert df.equals(d)
+    assert df.astype({'variable': object}).equals(
+        diamonds >> gather('variable', 'value', categorical=False))
 
     df = diamonds.copy()
     df['_ID'] = np.arange(df.shape[0])
     df = pd.melt(df, ['_ID'], variables, 'variable', 'value')
+    df['variable'] = pd.Categorical(df['variable'], categories=variables)
 
     assert df.equals(elongated)
 
 
+def test_gather_names():
+    wide = pd.DataFrame({
+        'store': ['a', 'b'],
+        'sales_2019': [3, 4],
+        'sales_2020': [5, 6],
+        'visits_2019': [7, 8]
+    })
+    d = wide >> gather(['variable', 'year'], 'value', X.sales_2019, X.sales_2020,
+                       X.visits_2019, names_sep='_')
+    expected = pd.DataFrame({
+        'store': ['a', 'b', 'a', 'b', 'a', 'b'],
+        'variable': pd.Categorical(['sales'] * 4 + ['visits'] * 2),
+        'year': pd.Categorical(['2019', '2019', '2020', '2020', '2019', '2019']),
+        'value': [3, 4, 5, 6, 7, 8]
+    })
+    assert d.equals(expected)
+
+    # several value columns melted at once
+    d = wide >> gather(['.value', 'year'], None, starts_with('sales'), X.visits_2019,
+                       names_pattern=r'(\w+)_(\d+)', categorical=False)
+    expected = pd.DataFrame({
+        'store': ['a', 'b', 'a', 'b'],
+        'year': ['2019', '2019', '2020', '2020'],
+        'sales': [3, 4, 5, 6],
+        'visits': [7, 8, np.nan, np.nan]
+    })
+    assert d.equals(expected)
+
+    with pytest.raises(ValueError):
+        wide >> gather(['variable', 'year'], 'value', X.sales_2019, X.store, names_sep='_')
+
+
 def test_spread(elongated):
 
     columns = elongated.columns.tolist()
@@ -103,6 +140,61 @@ def test_spread(elongated):
     assert df_conv.equals(d_spread_conv)
 
 
+def test_spread_ids_and_dtypes():
+    long = pd.DataFrame({
+        'store': ['b', 'a', 'b', 'a', np.nan, 'a'],
+        'day': [1, 1, 1, 2, 2, 1],
+        'variable': ['sales', 'sales', 'visits', 'visits', 'sales', 'visits'],
+        'value': [3, 1, 4, 2, 5, 9]
+    })
+    wide = long >> spread(X.variable, X.value)
+    expected = pd.DataFrame({
+        'store': ['a', 'a', 'b', np.nan],
+        'day': [1, 2, 1, 2],
+        'sales': [1, np.nan, 3, 5],
+        'visits': [9, 2, 4, np.nan]
+    })
+    assert wide.equals(expected)
+
+    # complete spreads keep the value dtype
+    wide = long.iloc[[0, 1, 2, 5]] >> spread(X.variable, X.value)
+    assert (wide.dtypes[['sales', 'visits']] == np.int64).all()
+    wide = long.assign(value=long.value.astype('Int64')) >> spread(X.variable, X.value)
+    assert wide.visits.dtype == 'Int64' and wide.visits.isna().sum() == 1
+
+    with pytest.raises(ValueError):
+        long.assign(day=1) >> spread(X.variable, X.value)
+
+
+def test_spread_sparse():
+    long = pd.DataFrame({
+        'store': ['b', 'a', 'b', 'a', np.nan, 'a'],
+        'day': [1, 1, 1, 2, 2, 1],
+        'variable': ['sales', 'sales', 'visits', 'visits', 'sales', 'visits'],
+        'value': ['3', '1', '4', '2', '5', '9']
+    })
+    for convert in [False, True]:
+        dense = long >> spread(X.variable, X.value, convert=convert)
+        wide = long >> spread(X.variable, X.value, convert=convert, sparse=True)
+        assert all(isinstance(wide[c].dtype, pd.SparseDtype) for c in ['sales', 'visits'])
+        assert wide.sales.sparse.density == 0.75
+        densified = wide.assign(sales=wide.sales.sparse.to_dense(),
+                                visits=wide.visits.sparse.to_dense())
+        assert densified.equals(dense)
+
+    wide = long >> spread(X.variable, X.value, convert=True, sparse=True)
+    dense = long >> spread(X.variable, X.value, convert=True)
+    summaries = dict(s=X.sales.sum(), m=mean(X.sales), md=median(X.sales), v=var(X.sales),
+                     sd=sd(X.visits), n=n_distinct(X.visits), lo=colmin(X.visits))
+    assert (wide >> summarize(**summaries)).equals(dense >> summarize(**summaries))
+    assert (wide >> group_by(X.day) >> summarize(**summaries)).equals(
+        dense >> group_by(X.day) >> summarize(**summaries))
+    assert (wide >> select(X.visits)).visits.dtype == pd.SparseDtype(np.float64)
+
+    with pytest.raises(ValueError):
+        long.assign(day=1) >> spread(X.variable, X.value, sparse=True)
+
+
 def test_separate():
 
     d = pd.DataFrame({
@@ -272,3 +272,23 @@ def test_drop_if():
     inverse_cols = [col for col in diamonds if col not in cols]
     df_if = diamonds[inverse_cols]
     assert df_if.equals(diamonds >> drop_if(lambda col: any(col.str.contains('.'))))
+
+
+def test_grouped_select_drop():
+    grouped = diamonds >> group_by(X.cut)
+    for verb, args in [(select, (X.price, X.cut)), (select, (starts_with('c'),)),
+                       (drop, (X.price,))]:
+        fast = grouped >> verb(*args)
+        slow = verb.function._apply(grouped, *args)
+        assert fast.equals(slow)
+        assert fast._grouped_by == ['cut']
+
+    # rows with missing grouping values are dropped, like by the other verbs
+    df = diamonds.head(200).copy()
+    df.loc[df.index[::5], 'cut'] = np.nan
+    grouped = df >> group_by(X.cut)
+    expected = (grouped >> mutate(p=X.price)).shape[0]
+    assert expected == 160
+    assert (grouped >> select(X.price, X.cut)).shape[0] == expected
+    assert (grouped >> drop(X.price)).shape[0] == expected
+    assert (grouped >> mask(X.price > 0)).shape[0] == expected
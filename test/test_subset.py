@@ -90,6 +90,16 @@ def test_mask():
     assert df.equals(test2)
 
 
+def test_grouped_mask():
+    grouped = diamonds >> group_by(X.cut, X.color)
+    for args in [(X.price > 330,), (X.price > lag(X.price), X.carat < 1),
+                 (~(X.price > 330),), (X.price > 0,)]:
+        fast = grouped >> mask(*args)
+        slow = mask.function._apply(grouped, *args)
+        assert fast.equals(slow)
+        assert fast._grouped_by == ['cut', 'color']
+
+
 # def test_mask_small():
 #     a = (diamonds >> group_by(X.cut) >> arrange(X.price) >>
 #          head(3) >> ungroup() >> mask(X.carat < 0.23))
@@ -116,3 +126,32 @@ def test_top_n():
     test6 = diamonds >> top_n(col=X.x, ascending=False, n=5)
     df6 = diamonds.sort_values('x', ascending=True).head(8).sort_index()
     assert test6.equals(df6)
+
+
+def test_grouped_subset_kernels():
+    grouped = diamonds.head(3000) >> group_by(X.cut, X.color)
+    cases = [
+        (head, (), {}), (head, (-2,), {}), (head, (1000,), {}),
+        (tail, (2,), {}), (tail, (-3,), {}),
+        (distinct, (X.clarity,), {}), (distinct, ('clarity', X.cut), {'keep': 'last'}),
+        (distinct, (), {}),
+        (row_slice, ([1, 0],), {}), (row_slice, (0,), {}),
+        (top_n, (), {'n': 2}), (top_n, (), {'n': 1, 'col': X.carat, 'ascending': False}),
+    ]
+    for verb, args, kwargs in cases:
+        fast = grouped >> verb(*args, **kwargs)
+        slow = verb.function._apply(grouped, *args, **kwargs)
+        assert fast.equals(slow)
+        assert fast._grouped_by == ['cut', 'color']
+
+
+def test_grouped_sample():
+    grouped = diamonds.head(3000) >> group_by(X.cut, X.color)
+    sizes = grouped.groupby(['cut', 'color']).size()
+    sampled = grouped >> sample(n=2)
+    assert (sampled.groupby(['cut', 'color']).size() == 2).all()
+    assert sampled.index.is_unique
+    sampled = grouped >> sample(frac=.5)
+    assert sampled.groupby(['cut', 'color']).size().equals(np.round(sizes * .5).astype(int))
+    seeded = grouped >> sample(n=2, random_state=3)
+    assert seeded.equals(sample.function._apply(grouped, n=2, random_state=3))
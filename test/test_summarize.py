@@ -55,3 +55,27 @@ def test_summarize_each():
 
     assert group.equals(test1)
     assert group.equals(test2)
+
+
+def test_grouped_summarize_kernel():
+    df = diamonds.head(2000).copy()
+    df.loc[df.index[::7], 'price'] = np.nan
+    df['flag'] = df.carat > 0.5
+    summaries = dict(
+        mean=mean(X.price), median=median(X.depth), var=var(X.price),
+        sd=sd(X.carat), n=n(X.x), n_distinct=n_distinct(X.price),
+        colmin=colmin(X.price), colmax=colmax(X.table), iqr=IQR(X.price),
+        first=first(X.price), last=last(X.clarity), nth=nth(X.carat, 2),
+        nth_neg=nth(X.carat, -3), mean_cut=mean(X.clarity), mean_flag=mean(X.flag)
+    )
+
+    grouped = df >> group_by(X.cut, X.color)
+    fast = grouped >> summarize(**summaries)
+    slow = summarize.function._apply(grouped, **summaries)
+    # groupby computes variances with a different summation order
+    pd.testing.assert_frame_equal(fast, slow)
+    assert fast._grouped_by == ['cut', 'color']
+
+    grouped = df >> group_by('cut')
+    assert (grouped >> summarize(m=mean(X.price))).equals(
+        summarize.function._apply(grouped, m=mean(X.price)))
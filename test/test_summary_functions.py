@@ -341,3 +341,52 @@ def test_sd():
     df_truth = pd.DataFrame({'cut': ['Fair', 'Good', 'Ideal', 'Premium', 'Very Good'],
                              's': [np.nan, np.nan, np.nan, np.nan, np.nan]})
     assert t.equals(df_truth)
+
+
+def test_grouped_mutate_summaries():
+    df = diamonds.head(3000).copy()
+    df.loc[df.index[::5], 'x'] = np.nan
+    df['cut_name'] = df.cut.astype(str)
+    summaries = dict(
+        share=X.price / mean(X.price), median=median(X.x), var=var(X.price),
+        z=(X.x - mean(X.x)) / sd(X.x), n=n(X.x), n_distinct=n_distinct(X.x),
+        colmin=colmin(X.price), colmax=colmax(X.x), IQR=IQR(X.price),
+        first=first(X.x), last=last(X.price), nth=nth(X.x, 3),
+        nth_back=nth(X.price, n=-2), text_mean=mean(X.cut_name),
+        text_min=colmin(X.cut_name)
+    )
+    grouped = df >> group_by(X.cut, X.color)
+    fast = grouped >> mutate(**summaries)
+    slow = mutate.function._apply(grouped, **summaries)
+    pd.testing.assert_frame_equal(fast, slow)
+    assert fast._grouped_by == ['cut', 'color']
+
+
+calls = []
+
+
+@symbolic_kind('aggregate')
+@make_symbolic
+def weighted_mean(series, weights):
+    return (series * weights).sum() / weights.sum()
+
+
+@grouped_implementation(weighted_mean, per_group=True)
+def grouped_weighted_mean(series, codes, weights):
+    calls.append(1)
+    return (series * weights).groupby(codes).sum() / weights.groupby(codes).sum()
+
+
+def test_registered_grouped_summary():
+    grouped = diamonds.head(3000) >> group_by(X.cut, X.color)
+    summaries = dict(w=weighted_mean(X.price, X.carat), r=mean(X.x) / mean(X.y) + 1,
+                     f=first(X.price, order_by=X.x))
+    del calls[:]
+    fast = grouped >> summarize(**summaries)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(fast, summarize.function._apply(grouped, **summaries))
+
+    centered = dict(c=X.price - weighted_mean(X.price, X.carat))
+    fast = grouped >> mutate(**centered)
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(fast, mutate.function._apply(grouped, **centered))
@@ -31,6 +31,16 @@ def test_group_mutate():
     assert df.equals(d.sort_index())
 
 
+def test_group_mutate_aggregating_accessors():
+    df = pd.DataFrame({'g': [1, 1, 2], 's': ['x', 'y', 'z']})
+    d = df >> group_by(X.g) >> mutate(c=X.s.str.cat(), u=X.s.str.upper())
+    assert d.c.tolist() == ['xy', 'xy', 'z']
+    assert d.u.tolist() == ['X', 'Y', 'Z']
+    # sized constants are aligned with the rows of each group
+    with pytest.raises(ValueError):
+        df >> group_by(X.g) >> mutate(n=X.g + [1, 2])
+
+
 def test_transmute():
     df = diamonds.copy()
     df['testcol'] = df['x'] * df['y']
@@ -188,3 +188,39 @@ def test_row_number():
     df['rn'] = [1, 1, 1, 2, 2]
     df['rn'] = df['rn'].astype(float)
     assert df.equals((diamonds >> head(5) >> group_by(X.cut) >> mutate(rn=row_number(X.x))).sort_index())
+
+
+def test_grouped_window_functions():
+    df = diamonds.head(3000).copy()
+    df.loc[df.index[::5], 'x'] = np.nan
+    windows = dict(
+        lag=lag(X.price), lead=lead(X.price, 2), cumsum=cumsum(X.price),
+        cummean=cummean(X.x), cummax=cummax(X.x), cummin=cummin(X.x),
+        cumprod=cumprod(X.carat), dense_rank=dense_rank(X.price),
+        min_rank=min_rank(X.price, ascending=False),
+        percent_rank=percent_rank(X.x), row_number=row_number(X.depth),
+        diff=X.price - lag(X.price), ratio=cumsum(X.x * 2) / row_number(X.x)
+    )
+    grouped = df >> group_by(X.cut, X.color)
+    fast = grouped >> mutate(**windows)
+    slow = mutate.function._apply(grouped, **windows)
+    pd.testing.assert_frame_equal(fast, slow)
+    assert fast._grouped_by == ['cut', 'color']
+
+
+def test_grouped_cumulative_dtypes():
+    df = pd.DataFrame({
+        'g': [1, 2, 1, 2, 1],
+        'b': [True, False, True, True, False],
+        't': pd.to_timedelta([1, 2, 3, 4, 5], unit='D'),
+        'd': pd.to_datetime(['2020-01-01'] * 5),
+        'n': [1, 2, 3, 4, 5]
+    })
+    windows = dict(p=cumprod(X.b), s=cumsum(X.b), ts=cumsum(X.t), ds=cumsum(X.d),
+                   np=cumprod(X.n))
+    grouped = df >> group_by(X.g)
+    fast = grouped >> mutate(**windows)
+    slow = mutate.function._apply(grouped, **windows)
+    pd.testing.assert_frame_equal(fast, slow)
+    assert fast.p.dtype == np.int64
+    assert fast.p.tolist() == [1, 0, 1, 0, 0]